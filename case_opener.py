@@ -1,33 +1,109 @@
 import tkinter as tk
-from tkinter import font, messagebox
-import random
+from tkinter import messagebox
+import argparse
 import math
-import time
-from problem_manager import ProblemManager, TIER_COLORS, TIER_PROBABILITIES
+import numpy as np
+from case_registry import CaseRegistry, DEFAULT_CASE
+from frame_profiler import FrameProfiler
+from problem_manager import TIERS
+from reel_renderer import FontCache, ReelRenderer
 from sound_manager import SoundManager
+from timeline import FramePacer, Timeline, Trajectory, ease_out_cubic
 
 class CaseOpenerApp:
-    def __init__(self, root):
+    def __init__(self, root, watch_interval=2000, profiler=None, seed=None, history=True, pity=False,
+                 weighted=False, problem_filter=None):
         self.root = root
         self.root.title("LeetCode Case Opener")
         self.root.geometry("1000x800")
         self.root.configure(bg="#0d1117")
         
-        self.problem_manager = ProblemManager()
-        self.sound_manager = SoundManager()
+        # Every case is discovered now but only parsed when first opened
+        self.case_registry = CaseRegistry(seed=seed)
+        self.case_registry.discover()
+        self.case_name = DEFAULT_CASE
+        self.history = history  # Log openings next to each case's problem file
+        self.pity = pity  # Boost rarer tiers after long dry streaks (needs history)
+        self.weighted = weighted  # Spaced-repetition weights within each tier
+        self.problem_filter = problem_filter  # Only open matching problems, e.g. "sliding window 1-300"
+        self.problem_manager = self.get_case(self.case_name)
+        # Audio is rendered on a worker thread so Tk callbacks never wait on it.
+        # pygame and the mixer start in the background too, so the window
+        # comes up first; sound switches on silently once they are ready.
+        self.sound_manager = SoundManager(background=True, lazy=True)
         self.is_opening = False
         self.scroll_position = 0
         self.scroll_speed = 0
         self.selected_problem = None
+        self.selected_problem_id = None
         self.selected_tier = None
-        self.last_spin_sound_time = 0
+        self.opening_seed = None  # Seed of the last opening; open_case(seed) replays it
+        self.watch_interval = watch_interval  # ms between learned.txt polls, None disables
+        self.fonts = FontCache()  # Shared by every widget and canvas item
+        self.profiler = profiler  # Optional FrameProfiler for the opening animation
+        # Drives every animation on one after() tick, paced by measured frame cost
+        self.pacer = FramePacer()
+        self.timeline = Timeline(self.root, pacer=self.pacer)
+        self.trajectory = None  # Scroll positions and spin speeds of the current opening
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        if self.watch_interval:
+            self.root.after(self.watch_interval, self.watch_problems)
+    
+    def watch_problems(self):
+        """Poll learned.txt and pull in edits without reshuffling tiers"""
+        # Reloading mid-opening could re-number problems the reel points at
+        if not self.is_opening and self.problem_manager.has_changed():
+            self.problem_manager.reload_problems(incremental=True)
+            self.warm_filter(self.problem_manager)
+            self.count_label.config(
+                text=f"Problems in collection: {self.problem_manager.get_problem_count()}"
+            )
+        elif not self.is_opening:
+            # The file has been quiet for a whole interval; persist the reloads
+            self.problem_manager.flush_snapshot()
+        self.root.after(self.watch_interval, self.watch_problems)
+    
+    def switch_case(self, name):
+        """Make another registered case the active one"""
+        if self.is_opening or name == self.case_name:
+            self.case_var.set(self.case_name)
+            return
+        self.problem_manager.flush_snapshot()
+        self.case_name = name
+        self.problem_manager = self.get_case(name)
+        self.reel.get_problem = self.problem_manager.get_problem
+        self.count_label.config(
+            text=f"Problems in collection: {self.problem_manager.get_problem_count()}"
+        )
+    
+    def get_case(self, name):
+        """Get a case's ProblemManager with history, weighting and the filter set up"""
+        manager = self.case_registry.get(name)
+        if (self.history or self.pity) and manager.history is None and manager.learned_file:
+            manager.enable_history(pity=self.pity)
+        if self.weighted and manager.weighted is None:
+            manager.enable_weighted()
+        self.warm_filter(manager)
+        return manager
+    
+    def warm_filter(self, manager):
+        """Build the keyword index and resolve the filter now rather than on the next click"""
+        if self.problem_filter:
+            manager.count_matching(self.problem_filter)
+    
+    def on_close(self):
+        """Shut down animations and background audio before destroying the window"""
+        self.timeline.cancel_all()
+        self.sound_manager.shutdown()
+        self.case_registry.close()
+        self.root.destroy()
         
     def setup_ui(self):
         """Setup the user interface"""
         # Title
-        title_font = font.Font(family="Arial", size=28, weight="bold")
+        title_font = self.fonts.get("Arial", 28, "bold")
         title_label = tk.Label(
             self.root,
             text="LeetCode Case Opener",
@@ -37,6 +113,21 @@ class CaseOpenerApp:
         )
         title_label.pack(pady=15)
         
+        # Case selector, only when there is more than one case to pick from
+        self.case_var = tk.StringVar(self.root, value=self.case_name)
+        case_names = self.case_registry.names()
+        if len(case_names) > 1:
+            case_menu = tk.OptionMenu(self.root, self.case_var, *case_names, command=self.switch_case)
+            case_menu.config(
+                font=self.fonts.get("Arial", 11),
+                bg="#161b22",
+                fg="#FFFFFF",
+                activebackground="#30363d",
+                activeforeground="#FFFFFF",
+                highlightthickness=0
+            )
+            case_menu.pack()
+        
         # Case display area - will show the case initially
         self.case_frame = tk.Frame(self.root, bg="#0d1117", width=900, height=200)
         self.case_frame.pack(pady=10)
@@ -66,6 +157,21 @@ class CaseOpenerApp:
         # Center indicator line
         self.center_line_x = 450
         
+        # Card items on the loot bar are created once and recycled
+        self.reel = ReelRenderer(
+            self.scroll_canvas,
+            self.problem_manager.get_problem,
+            self.fonts,
+            center_x=self.center_line_x
+        )
+        # Gold flash overlay, above the cards and hidden until a Gold reveal
+        self.flash_rect = self.scroll_canvas.create_rectangle(
+            0, 0, 900, 250,
+            fill="#FFD700",
+            outline="",
+            state="hidden"
+        )
+        
         # Problem reveal area (initially hidden)
         self.reveal_frame = tk.Frame(self.root, bg="#0d1117")
         self.reveal_frame.pack(pady=20)
@@ -73,7 +179,7 @@ class CaseOpenerApp:
         self.problem_label = tk.Label(
             self.reveal_frame,
             text="",
-            font=font.Font(family="Arial", size=22, weight="bold"),
+            font=self.fonts.get("Arial", 22, "bold"),
             bg="#0d1117",
             fg="#FFFFFF",
             wraplength=900
@@ -83,14 +189,25 @@ class CaseOpenerApp:
         self.tier_label = tk.Label(
             self.reveal_frame,
             text="",
-            font=font.Font(family="Arial", size=16),
+            font=self.fonts.get("Arial", 16),
             bg="#0d1117",
             fg="#FFFFFF"
         )
         self.tier_label.pack(pady=10)
         
+        # Celebration line, shown in the window so it never blocks input
+        self.celebration_label = tk.Label(
+            self.reveal_frame,
+            text="",
+            font=self.fonts.get("Arial", 12),
+            bg="#0d1117",
+            fg="#8b949e",
+            justify=tk.CENTER
+        )
+        self.celebration_label.pack()
+        
         # Open button
-        button_font = font.Font(family="Arial", size=18, weight="bold")
+        button_font = self.fonts.get("Arial", 18, "bold")
         self.open_button = tk.Button(
             self.root,
             text="OPEN CASE",
@@ -109,14 +226,14 @@ class CaseOpenerApp:
         self.open_button.pack(pady=20)
         
         # Problem count label
-        count_label = tk.Label(
+        self.count_label = tk.Label(
             self.root,
             text=f"Problems in collection: {self.problem_manager.get_problem_count()}",
-            font=font.Font(family="Arial", size=11),
+            font=self.fonts.get("Arial", 11),
             bg="#0d1117",
             fg="#8b949e"
         )
-        count_label.pack(pady=5)
+        self.count_label.pack(pady=5)
         
     def draw_case(self):
         """Draw the case box"""
@@ -132,100 +249,26 @@ class CaseOpenerApp:
         self.case_canvas.create_text(
             100, 90,
             text="📦",
-            font=font.Font(family="Arial", size=50)
+            font=self.fonts.get("Arial", 50)
         )
         self.case_canvas.create_text(
             100, 150,
             text="CASE",
-            font=font.Font(family="Arial", size=18, weight="bold"),
+            font=self.fonts.get("Arial", 18, "bold"),
             fill="#FFFFFF"
         )
     
-    def generate_fake_items(self, count=100):
+    def generate_fake_items(self, count=100, rng=None):
         """Generate fake items for the scrolling animation using CS:GO probabilities"""
-        fake_items = []
-        
-        # Use actual CS:GO probabilities for fake items
-        tiers = list(TIER_PROBABILITIES.keys())
-        probabilities = list(TIER_PROBABILITIES.values())
-        
-        # Generate items using actual drop rates
-        for i in range(count):
-            # Select tier based on CS:GO probabilities
-            rand = random.random() * 100
-            cumulative = 0
-            selected_tier = "Mil-Spec (Blue)"  # Default
-            
-            for tier, probability in TIER_PROBABILITIES.items():
-                cumulative += probability
-                if rand <= cumulative:
-                    selected_tier = tier
-                    break
-            
-            # Get a random problem from the assigned tier (or any problem if tier is empty)
-            tier_problems = self.problem_manager.tiered_problems.get(selected_tier, [])
-            if tier_problems:
-                problem = random.choice(tier_problems)
-            elif self.problem_manager.problems:
-                problem = random.choice(self.problem_manager.problems)
-            else:
-                problem = f"Problem {i+1}"
-            
-            fake_items.append((problem, selected_tier))
-        
-        return fake_items
+        # One vectorized draw through the shared tier sampler.
+        # Items are (problem id, tier) so cards never compare full strings.
+        return self.problem_manager.open_many_ids(count, rng, self.problem_filter)
     
-    def draw_item_card(self, canvas, x, y, width, height, problem, tier, is_selected=False):
-        """Draw a single item card - all cards show tier color like CS:GO"""
-        tier_color = TIER_COLORS.get(tier, "#FFFFFF")
-        
-        # All cards show their tier color background
-        # Selected card gets white border and is brighter
-        if is_selected:
-            # Highlight selected card with white border and full brightness
-            canvas.create_rectangle(
-                x, y, x + width, y + height,
-                fill=tier_color,
-                outline="#FFFFFF",
-                width=4
-            )
-        else:
-            # Non-selected cards: tier color with slightly darker overlay
-            canvas.create_rectangle(
-                x, y, x + width, y + height,
-                fill=tier_color,
-                outline=tier_color,
-                width=2
-            )
-            # Dark overlay to make it slightly dimmer (like CS:GO)
-            canvas.create_rectangle(
-                x, y, x + width, y + height,
-                fill="#000000",
-                outline="",
-                stipple="gray50"  # 50% opacity dark overlay
-            )
+    def open_case(self, seed=None):
+        """Handle case opening - CS:GO style
         
-        # Problem text (truncate if too long)
-        problem_text = problem[:30] + "..." if len(problem) > 30 else problem
-        canvas.create_text(
-            x + width/2, y + height/2 - 20,
-            text=problem_text,
-            font=font.Font(family="Arial", size=11, weight="bold"),
-            fill="#FFFFFF",
-            width=width - 20
-        )
-        
-        # Tier name
-        tier_short = tier.split()[0]
-        canvas.create_text(
-            x + width/2, y + height/2 + 20,
-            text=tier_short,
-            font=font.Font(family="Arial", size=10),
-            fill="#FFFFFF"
-        )
-    
-    def open_case(self):
-        """Handle case opening - CS:GO style"""
+        Pass a previous opening_seed to replay that opening's result and reel.
+        """
         if self.is_opening:
             return
         
@@ -236,16 +279,27 @@ class CaseOpenerApp:
             )
             return
         
+        if self.problem_filter and self.problem_manager.count_matching(self.problem_filter) == 0:
+            messagebox.showwarning(
+                "No Matching Problems",
+                f"No problems match the filter \"{self.problem_filter}\"."
+            )
+            return
+        
         self.is_opening = True
         self.open_button.config(state=tk.DISABLED, text="OPENING...")
         
         # Hide previous result
         self.problem_label.config(text="")
         self.tier_label.config(text="")
+        self.celebration_label.config(text="")
         self.reveal_frame.pack_forget()
         
-        # Determine the result FIRST (like CS:GO - result is predetermined)
-        self.selected_problem, self.selected_tier = self.problem_manager.open_case()
+        # Determine the result FIRST (like CS:GO - result is predetermined).
+        # The result and the reel share one seeded generator per opening.
+        self.opening_seed, rng = self.problem_manager.new_opening(seed)
+        self.selected_problem, self.selected_tier = self.problem_manager.open_case(rng, self.problem_filter)
+        self.selected_problem_id = self.problem_manager.get_problem_id(self.selected_problem)
         
         # Step 1: Case opens - play opening sound
         self.sound_manager.play_case_open()
@@ -253,12 +307,13 @@ class CaseOpenerApp:
         self.scroll_canvas.pack(pady=10)
         
         # Generate fake items for scrolling
-        self.fake_items = self.generate_fake_items(100)
+        self.fake_items = self.generate_fake_items(100, rng)
         
         # Insert the actual selected item at a FIXED position for consistent timing
         # Use fixed position: 50 (middle of 100 items)
         insert_pos = 50
-        self.fake_items.insert(insert_pos, (self.selected_problem, self.selected_tier))
+        self.fake_items.insert(insert_pos, (self.selected_problem_id, self.selected_tier))
+        self.reel.set_items(self.fake_items, (self.selected_problem_id, self.selected_tier))
         
         # Calculate target position so the selected card is centered
         card_width = 200
@@ -275,149 +330,92 @@ class CaseOpenerApp:
         # Start position: -400 (off-screen)
         # Target position: ~10,500 pixels
         # Total distance: ~10,900 pixels
-        # We'll use a fixed timing curve to ensure 3.5 seconds
-        self.animation_start_time = None
+        # The timeline's fixed timing curve ensures 3.5 seconds
         self.animation_duration = 3500  # 3.5 seconds in milliseconds
-        
-        # Start scrolling animation
-        self.scroll_position = -card_width * 2  # Start off-screen
-        self.scroll_speed = 60  # Start faster
-        self.animation_frame = 0
-        self.animation_start_time = time.time() * 1000  # milliseconds
-        
-        self.animate_scroll()
+        self.scroll_start = -card_width * 2  # Start off-screen
+        self.scroll_position = self.scroll_start
+        # Render every card the reel will pass over now, so frames only swap images
+        self.reel.warm(self.scroll_start, self.target_position)
+        
+        # Precompute the whole scroll: ease-out cubic position for a smooth
+        # slowdown onto the target, and the spin sound's speed factor,
+        # 1.0 (fast) to 0.1 (slow), one row per ms
+        total_distance = self.target_position - self.scroll_start
+        self.trajectory = Trajectory.build(self.animation_duration, [
+            lambda t: self.scroll_start + total_distance * ease_out_cubic(t),
+            lambda t: np.maximum(0.1, 1.0 - t * 0.9),
+        ])
+        if self.profiler:
+            self.profiler.begin_opening(self.animation_duration)
+        
+        # Scroll, hold 0.5 s, flash if Gold, reveal - all as timeline
+        # keyframes, so the event loop is never blocked
+        opening = self.timeline.sequence("opening")
+        opening.tween(self.animation_duration, self.animate_scroll)
+        opening.call(self.finish_scroll)
+        opening.wait(500)
+        if self.selected_tier == "Exceedingly Rare (Gold)":
+            opening.call(self.sound_manager.play_gold_reveal)
+            for flash in range(3):
+                opening.call(lambda: self.set_flash(True)).wait(80)
+                opening.call(lambda: self.set_flash(False)).wait(80)
+        opening.call(self.reveal_item)
+        opening.wait(500)
+        opening.call(self.show_celebration)
+        opening.on_cancel = lambda: self.set_flash(False)
+        opening.start()
     
-    def animate_scroll(self):
-        """Animate the scrolling loot bar with slowdown"""
-        self.scroll_canvas.delete("all")
-        
-        card_width = 200
-        card_height = 180
-        card_spacing = 10
-        center_y = 125
-        
-        # Draw center indicator line
-        self.scroll_canvas.create_line(
-            self.center_line_x, 20,
-            self.center_line_x, 230,
-            fill="#FFFFFF",
-            width=3,
-            dash=(5, 5)
-        )
-        
-        # Draw visible cards
-        visible_start = max(0, int(self.scroll_position / (card_width + card_spacing)) - 2)
-        visible_end = min(len(self.fake_items), visible_start + 10)
-        
-        for i in range(visible_start, visible_end):
-            x = i * (card_width + card_spacing) - self.scroll_position
-            y = center_y - card_height / 2
-            
-            # Only draw if card is visible
-            if -card_width < x < 900 + card_width:
-                problem, tier = self.fake_items[i]
-                is_selected = (problem == self.selected_problem and tier == self.selected_tier)
-                self.draw_item_card(
-                    self.scroll_canvas,
-                    x, y,
-                    card_width, card_height,
-                    problem, tier,
-                    is_selected
-                )
-        
-        # FIXED DURATION ANIMATION - Use time-based easing
-        current_time = time.time() * 1000  # milliseconds
-        elapsed = current_time - self.animation_start_time
-        progress = min(elapsed / self.animation_duration, 1.0)  # 0.0 to 1.0
-        
-        # Easing function: ease-out cubic for smooth slowdown
-        # Using cubic ease-out: 1 - (1 - t)^3
-        eased_progress = 1 - pow(1 - progress, 3)
-        
-        # Calculate position based on eased progress
-        start_pos = -card_width * 2
-        target_x = self.target_position
-        total_distance = target_x - start_pos
-        self.scroll_position = start_pos + (total_distance * eased_progress)
-        
-        # Play spinning sound that slows down
-        # Speed factor: 1.0 (fast) to 0.1 (slow)
-        speed_factor = max(0.1, 1.0 - progress * 0.9)
-        current_time_sec = time.time()
-        # Play spin sound every 50ms during animation
-        if current_time_sec - self.last_spin_sound_time > 0.05:
-            self.sound_manager.play_spin(speed_factor)
-            self.last_spin_sound_time = current_time_sec
-        
-        # Calculate speed for next frame (for visual smoothness)
+    def animate_scroll(self, progress):
+        """Animate the scrolling loot bar with slowdown (one timeline frame)"""
+        profiler = self.profiler
+        if profiler:
+            profiler.begin_frame()
+        
+        # Pick the sample for when this frame will be on screen, one
+        # frame cost ahead; the last frame lands exactly on the target
+        elapsed = progress * self.animation_duration
         if progress < 1.0:
-            # Still animating
-            delay = max(8, int(1000 / 60))  # ~60 FPS
-            self.root.after(delay, self.animate_scroll)
-        else:
-            # Animation complete - play stop sound
-            self.sound_manager.play_stop()
-            self.scroll_position = target_x
-            self.scroll_speed = 0
-            # Redraw at final position
-            self.draw_final_position()
-            # Hold for 0.5 seconds before revealing
-            self.root.after(500, self.reveal_item)
+            elapsed += self.pacer.lead_ms
+        position, speed_factor = self.trajectory.at(elapsed).tolist()
+        self.scroll_position = position
+        if profiler:
+            profiler.mark("easing")
+        
+        # Only repositions the reel's existing canvas items
+        self.reel.render(self.scroll_position)
+        if profiler:
+            profiler.mark("draw")
+        
+        # Stream the spinning sound as it slows down
+        self.sound_manager.play_spin(speed_factor)
+        if profiler:
+            profiler.mark("audio")
+            profiler.end_frame()
+    
+    def finish_scroll(self):
+        """End the spin and play the stop sound"""
+        self.sound_manager.stop_spin()
+        self.sound_manager.play_stop()
+        self.scroll_position = self.target_position
+        # Redraw at final position
+        self.draw_final_position()
+        if self.profiler:
+            self.profiler.dump()
+    
+    def set_flash(self, visible):
+        """Show or hide the Gold flash overlay"""
+        self.scroll_canvas.itemconfig(self.flash_rect, state="normal" if visible else "hidden")
     
     def draw_final_position(self):
         """Draw the final position with selected card centered"""
-        self.scroll_canvas.delete("all")
-        card_width = 200
-        card_height = 180
-        card_spacing = 10
-        center_y = 125
-        
-        # Draw center indicator line (solid now)
-        self.scroll_canvas.create_line(
-            self.center_line_x, 20,
-            self.center_line_x, 230,
-            fill="#FFFFFF",
-            width=4
-        )
-        
-        # Find and draw the selected card centered
-        for i, (problem, tier) in enumerate(self.fake_items):
-            x = i * (card_width + card_spacing) - self.scroll_position
-            y = center_y - card_height / 2
-            
-            is_selected = (problem == self.selected_problem and tier == self.selected_tier)
-            
-            # Only draw if card is visible or is the selected card
-            if is_selected or (-card_width < x < 900 + card_width):
-                self.draw_item_card(
-                    self.scroll_canvas,
-                    x, y,
-                    card_width, card_height,
-                    problem, tier,
-                    is_selected
-                )
+        # Center indicator line turns solid now
+        self.reel.set_final(True)
+        self.reel.render(self.scroll_position)
     
     def reveal_item(self):
-        """Final reveal with gold flash if gold tier"""
+        """Final reveal (after the gold flash, if any)"""
         tier_color = self.problem_manager.get_tier_color(self.selected_tier)
         
-        # Gold flash effect for gold tier
-        if self.selected_tier == "Exceedingly Rare (Gold)":
-            # Play gold reveal sound
-            self.sound_manager.play_gold_reveal()
-            for flash in range(3):
-                # Create flash overlay
-                flash_rect = self.scroll_canvas.create_rectangle(
-                    0, 0, 900, 250,
-                    fill="#FFD700",
-                    outline=""
-                )
-                self.root.update()
-                self.root.after(80)
-                self.scroll_canvas.delete(flash_rect)
-                self.root.update()
-                self.root.after(80)
-        
         # Redraw final position (card should already be centered from draw_final_position)
         # But redraw to show the final reveal state
         self.draw_final_position()
@@ -433,18 +431,42 @@ class CaseOpenerApp:
             fg=tier_color
         )
         
+        # The next opening may start right away; it replaces this one's
+        # remaining keyframes
         self.is_opening = False
         self.open_button.config(state=tk.NORMAL, text="OPEN CASE")
-        
-        # Show celebration message
-        self.root.after(500, lambda: messagebox.showinfo(
-            "Case Opened! 🎉",
-            f"You got: {self.selected_problem}\n\nTier: {self.selected_tier}\n\nTime to solve it!"
-        ))
+    
+    def show_celebration(self):
+        """Celebration message, shown in the window rather than a modal dialog"""
+        message = f"Case Opened! 🎉 Time to solve it!\nSeed: {self.opening_seed}"
+        history = self.problem_manager.history
+        if history is not None:
+            message += f"   Opens since last Gold: {history.opens_since(len(TIERS) - 1)}"
+        self.celebration_label.config(text=message)
 
 def main():
+    parser = argparse.ArgumentParser(description="LeetCode Case Opener")
+    parser.add_argument(
+        "--profile", nargs="?", const="-", metavar="JSON_FILE",
+        help="time animation frames; print a summary per opening, or write it to JSON_FILE"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="root seed for reproducible tiers and openings")
+    parser.add_argument("--no-history", action="store_true", help="do not log openings to <problem file>.history")
+    parser.add_argument("--pity", action="store_true", help="boost Covert and Gold odds after long dry streaks")
+    parser.add_argument("--weighted", action="store_true", help="favor problems that have not come up recently")
+    parser.add_argument(
+        "--filter", default=None, metavar="TERMS",
+        help='only open problems matching every term, e.g. "sliding window" or "1-300"'
+    )
+    args = parser.parse_args()
+    
+    profiler = None
+    if args.profile:
+        profiler = FrameProfiler(output=None if args.profile == "-" else args.profile)
+    
     root = tk.Tk()
-    app = CaseOpenerApp(root)
+    app = CaseOpenerApp(root, profiler=profiler, seed=args.seed, history=not args.no_history, pity=args.pity,
+                        weighted=args.weighted, problem_filter=args.filter)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+from problem_manager import ProblemManager
+from rng_stream import RngStream
+
+DEFAULT_CASE = "learned"
+
+def topic_title(filename: str) -> str:
+    """Turn a visualizer file name into a problem title
+    
+    "632_smallest_range_covering_elements_from_k_lists" becomes
+    "632. Smallest Range Covering Elements From K Lists".
+    """
+    stem = os.path.splitext(filename)[0]
+    words = [w for w in re.split(r"[_\-\s]+", stem) if w and w.lower() != "visualizer"]
+    if words and words[0].isdigit():
+        return f"{words[0]}. " + " ".join(w.capitalize() for w in words[1:])
+    return " ".join(w.capitalize() for w in words)
+
+class CaseRegistry:
+    """Named cases backed by problem files, built lazily and kept in an LRU
+    
+    Cases are discovered up front but only parsed on first open. At most
+    max_resident built cases (and, if set, max_bytes of problem data)
+    stay in memory; the least recently opened one is dropped first and
+    rebuilt from its file (or tier snapshot) when opened again.
+    """
+    
+    def __init__(self, max_resident: int = 8, max_bytes: Optional[int] = None, seed=None):
+        self.max_resident = max(1, max_resident)
+        self.max_bytes = max_bytes
+        # Each case draws from a child stream keyed by its name, so a seed
+        # reproduces every case no matter which order they are opened in
+        self.rng = seed if isinstance(seed, RngStream) else RngStream(seed)
+        self.sources: Dict[str, str] = {}  # case name -> problem file
+        self.static_sources: Dict[str, List[str]] = {}  # case name -> in-memory problems
+        self.resident = OrderedDict()  # case name -> ProblemManager, oldest first
+        self.resident_bytes: Dict[str, int] = {}
+        self.measured_counts: Dict[str, int] = {}  # Problem count when resident_bytes was measured
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def discover(self, default_file: str = "learned.txt", case_dirs: Sequence[str] = ("cases",),
+                 visualizer_dir: Optional[str] = "visualizer"):
+        """Register the default file, every *.txt under case_dirs and the visualizer topics"""
+        self.register(DEFAULT_CASE, default_file)
+        for case_dir in case_dirs:
+            if not os.path.isdir(case_dir):
+                continue
+            for root, _, files in os.walk(case_dir):
+                for filename in sorted(files):
+                    if filename.endswith(".txt"):
+                        path = os.path.join(root, filename)
+                        name = os.path.splitext(os.path.relpath(path, case_dir))[0]
+                        self.register(name.replace(os.sep, "/"), path)
+        
+        if visualizer_dir and os.path.isdir(visualizer_dir):
+            topics = [topic_title(entry) for entry in sorted(os.listdir(visualizer_dir))]
+            self.register_static("visualizer", topics)
+    
+    def register(self, name: str, path: str):
+        """Register a case backed by a problem file"""
+        self.sources[name] = path
+        self.static_sources.pop(name, None)
+        self.evict(name)
+    
+    def register_static(self, name: str, problems: List[str]):
+        """Register a case backed by a fixed list of problems"""
+        self.static_sources[name] = list(problems)
+        self.sources.pop(name, None)
+        self.evict(name)
+    
+    def names(self) -> List[str]:
+        """All registered case names, default case first"""
+        names = sorted(set(self.sources) | set(self.static_sources))
+        if DEFAULT_CASE in names:
+            names.remove(DEFAULT_CASE)
+            names.insert(0, DEFAULT_CASE)
+        return names
+    
+    def get(self, name: str) -> ProblemManager:
+        """Get a case's ProblemManager, building it on first use"""
+        manager = self.resident.get(name)
+        if manager is not None:
+            self.resident.move_to_end(name)
+            self.hits += 1
+            # Reloads grow a case in place; re-measure it once its size changed
+            if len(manager.problems) != self.measured_counts[name]:
+                self._measure(name, manager)
+                self._enforce_limits()
+            return manager
+        
+        if name in self.static_sources:
+            manager = ProblemManager(problems=self.static_sources[name], seed=self.rng.derive(name))
+        elif name in self.sources:
+            manager = ProblemManager(self.sources[name], seed=self.rng.derive(name))
+        else:
+            raise KeyError(f"Unknown case: {name}")
+        self.misses += 1
+        
+        self.resident[name] = manager
+        self._measure(name, manager)
+        self._enforce_limits()
+        return manager
+    
+    def _measure(self, name: str, manager: ProblemManager):
+        self.resident_bytes[name] = manager.memory_footprint()
+        self.measured_counts[name] = len(manager.problems)
+    
+    def evict(self, name: str) -> bool:
+        """Drop a built case from memory; returns True if it was resident"""
+        manager = self.resident.pop(name, None)
+        if manager is None:
+            return False
+        manager.close()
+        self.resident_bytes.pop(name, None)
+        self.measured_counts.pop(name, None)
+        self.evictions += 1
+        return True
+    
+    def close(self):
+        """Close every resident case, e.g. on shutdown; they stay usable but stop logging"""
+        for manager in self.resident.values():
+            manager.close()
+    
+    def _enforce_limits(self):
+        # Never evict the case that was just opened
+        while len(self.resident) > 1 and (
+            len(self.resident) > self.max_resident
+            or (self.max_bytes is not None and self.memory_usage() > self.max_bytes)
+        ):
+            self.evict(next(iter(self.resident)))
+    
+    def memory_usage(self) -> int:
+        """Approximate bytes held by all resident cases"""
+        return sum(self.resident_bytes.values())
+    
+    def stats(self) -> Dict[str, int]:
+        """Get registry size, residency and hit/miss/eviction counters"""
+        return {
+            "cases": len(self.names()),
+            "resident": len(self.resident),
+            "resident_bytes": self.memory_usage(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,321 @@
+"""Headless case-opening server
+
+Serves one shared ProblemManager over a small HTTP/JSON API on asyncio,
+so a whole team can open cases from the same collection:
+
+    GET  /open[?seed=N]             one opening (the seed replays it)
+                                    (filter=TERMS only opens matching
+                                    problems, e.g. "sliding window 1-300")
+    GET  /open/batch?count=N        N openings in one vectorized draw
+                                    (takes the same filter=TERMS)
+    GET  /tier?problem=TEXT         tier lookup for a problem
+    POST /reload[?incremental=1]    re-read the problem file
+    GET  /stats                     collection size and load statistics
+    POST /solved?problem=TEXT       push a solved problem back (--weighted)
+    GET  /history[?last=N]          dry streaks and per-tier counts (--history)
+    GET  /metrics[?format=json]     drop telemetry as metrics text or JSON
+                                    (reset=1 starts a new counting window)
+
+Adding session=ID to /open, /open/batch or /tier uses that session's
+own tier assignment over the shared catalog instead of the server's.
+
+    python case_server.py --file learned.txt --port 8080
+"""
+import argparse
+import asyncio
+import copy
+import json
+import traceback
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from problem_catalog import ProblemCatalog, SessionView
+from problem_manager import ProblemManager, TIERS
+from weighted_selection import SpacedRepetition
+
+MAX_BATCH = 10_000
+MAX_HEADER_BYTES = 16 * 1024
+MAX_SESSIONS = 100_000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class CaseServer:
+    """asyncio HTTP/1.1 server (keep-alive) around one ProblemManager
+    
+    Every request handler is plain in-memory work on the event loop.
+    Reloads run in the default thread pool on a copy of the manager and
+    the finished copy is swapped in, so requests never wait on file I/O
+    and never see a half-reloaded collection.
+    """
+    
+    def __init__(self, manager: ProblemManager, max_sessions: int = MAX_SESSIONS):
+        self.manager = manager
+        # Session views draw from child streams keyed by session id, so a
+        # seeded server gives a session the same tiers every time it is seen
+        self.rng = manager.rng
+        # Sessions share one read-only catalog and each own only a tier
+        # permutation; the least recently used session is dropped first
+        self.catalog = ProblemCatalog.from_manager(manager)
+        self.sessions = OrderedDict()  # session id -> SessionView
+        self.max_sessions = max_sessions
+        self.requests = 0
+        self._reload_task: Optional[asyncio.Task] = None
+        self._routes = {
+            ("GET", "/open"): self.handle_open,
+            ("GET", "/open/batch"): self.handle_batch_open,
+            ("GET", "/tier"): self.handle_tier,
+            ("POST", "/reload"): self.handle_reload,
+            ("GET", "/stats"): self.handle_stats,
+            ("GET", "/metrics"): self.handle_metrics,
+            ("GET", "/history"): self.handle_history,
+            ("POST", "/solved"): self.handle_solved,
+        }
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        return await asyncio.start_server(
+            self.handle_connection, host, port, backlog=4096, limit=MAX_HEADER_BYTES
+        )
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, {"error": "headers too large"}, False)
+                    return
+                
+                keep_alive = True
+                try:
+                    method, target, headers = self._parse_head(head)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length:
+                        await reader.readexactly(length)  # Request bodies are not used
+                    status, payload = 200, await self.dispatch(method, target)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    # A handler bug answers this request with a 500 instead of dropping the connection
+                    traceback.print_exc()
+                    status, payload = 500, {"error": f"internal error: {type(e).__name__}"}
+                self.requests += 1
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    @staticmethod
+    def _parse_head(head: bytes) -> Tuple[str, str, Dict[str, str]]:
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3:
+            raise HttpError(400, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        return parts[0].upper(), parts[1], headers
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        """Send a dict as JSON, or a str as plain text"""
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+    
+    async def dispatch(self, method: str, target: str) -> Union[dict, str]:
+        """Route a request to its handler"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handler = self._routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self._routes):
+                raise HttpError(405, f"{method} not allowed on {url.path}")
+            raise HttpError(404, f"no route for {url.path}")
+        return await handler(query)
+    
+    def session(self, query: Dict[str, str]):
+        """The SessionView named by ?session=, or the shared manager"""
+        session_id = query.get("session")
+        if session_id is None:
+            return self.manager
+        view = self.sessions.get(session_id)
+        if view is None:
+            view = self.catalog.new_view(self.rng.derive(session_id))
+            self.sessions[session_id] = view
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        return view
+    
+    async def handle_open(self, query: Dict[str, str]) -> dict:
+        source = self.session(query)
+        problem_filter = query.get("filter")
+        if source is not self.manager:
+            if problem_filter:
+                raise HttpError(400, "filter is only supported without a session")
+            problem, tier = source.open_case()
+            return {"problem": problem, "tier": tier, "color": source.get_tier_color(tier)}
+        if problem_filter and source.count_matching(problem_filter) == 0:
+            raise HttpError(404, f"no problems match filter: {problem_filter}")
+        # Shared openings report their seed; ?seed= (with the same
+        # ?filter=) replays one
+        seed = query.get("seed")
+        seed, rng = source.new_opening(None if seed is None else int(seed))
+        problem, tier = source.open_case(rng, problem_filter)
+        return {"problem": problem, "tier": tier, "color": source.get_tier_color(tier), "seed": seed}
+    
+    async def handle_batch_open(self, query: Dict[str, str]) -> dict:
+        count = int(query.get("count", 10))
+        if not 1 <= count <= MAX_BATCH:
+            raise HttpError(400, f"count must be between 1 and {MAX_BATCH}")
+        source = self.session(query)
+        problem_filter = query.get("filter")
+        if problem_filter:
+            if source is not self.manager:
+                raise HttpError(400, "filter is only supported without a session")
+            if source.count_matching(problem_filter) == 0:
+                raise HttpError(404, f"no problems match filter: {problem_filter}")
+            results = source.open_many(count, problem_filter)
+        else:
+            results = source.open_many(count)
+        return {"results": [{"problem": problem, "tier": tier} for problem, tier in results]}
+    
+    async def handle_tier(self, query: Dict[str, str]) -> dict:
+        problem = query.get("problem")
+        if not problem:
+            raise HttpError(400, "missing problem parameter")
+        source = self.session(query)
+        catalog = source.catalog if isinstance(source, SessionView) else source
+        if catalog.get_problem_id(problem) is None:
+            raise HttpError(404, f"unknown problem: {problem}")
+        tier = source.get_problem_tier(problem)
+        return {"problem": problem, "tier": tier, "color": source.get_tier_color(tier)}
+    
+    async def handle_reload(self, query: Dict[str, str]) -> dict:
+        incremental = query.get("incremental", "0").lower() in ("1", "true", "yes")
+        # Concurrent reload requests share the one already running
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._reload(incremental))
+        added = await asyncio.shield(self._reload_task)
+        return {"added": added, "problems": self.manager.get_problem_count()}
+    
+    async def _reload(self, incremental: bool) -> int:
+        loop = asyncio.get_running_loop()
+        # Openings keep changing the weights, so they are copied here on the loop thread
+        weighted = copy.deepcopy(self.manager.weighted)
+        manager, catalog, added = await loop.run_in_executor(
+            None, self._reload_copy, self.manager, incremental, weighted
+        )
+        # Swapped here on the loop thread; the worker never touched the live manager
+        manager.take_telemetry(self.manager)
+        # Existing sessions keep the catalog they were created with
+        self.manager = manager
+        self.catalog = catalog
+        return added
+    
+    @staticmethod
+    def _reload_copy(manager: ProblemManager, incremental: bool,
+                     weighted: Optional[SpacedRepetition]) -> Tuple[ProblemManager, ProblemCatalog, int]:
+        """Runs in a worker thread; the live manager is only read, never modified"""
+        manager = manager.copy(weighted)
+        added = manager.reload_problems(incremental)
+        manager.flush_snapshot()  # Off the event loop, so writing it here is free
+        return manager, ProblemCatalog.from_manager(manager), added
+    
+    async def handle_stats(self, query: Dict[str, str]) -> dict:
+        return {
+            "problems": self.manager.get_problem_count(),
+            "tiers": {tier: len(problems) for tier, problems in self.manager.tiered_problems.items()},
+            "load": self.manager.get_load_stats(),
+            "sessions": len(self.sessions),
+            "session_bytes": sum(view.memory_footprint() for view in self.sessions.values()),
+            "requests": self.requests,
+        }
+    
+    async def handle_solved(self, query: Dict[str, str]) -> dict:
+        problem = query.get("problem")
+        if not problem:
+            raise HttpError(400, "missing problem parameter")
+        if self.manager.weighted is None:
+            raise HttpError(404, "weighted selection is not enabled")
+        if not self.manager.mark_solved(problem):
+            raise HttpError(404, f"unknown problem: {problem}")
+        return {"problem": problem, "weight": self.manager.get_problem_weight(problem)}
+    
+    async def handle_history(self, query: Dict[str, str]) -> dict:
+        history = self.manager.history
+        if history is None:
+            raise HttpError(404, "opening history is not enabled")
+        last = int(query["last"]) if "last" in query else None
+        return {
+            "opens": len(history),
+            "opens_since": {tier: history.opens_since(i) for i, tier in enumerate(TIERS)},
+            "tier_counts": dict(zip(TIERS, history.tier_counts(last).tolist())),
+            "pity": None if self.manager.pity is None else {
+                TIERS[tier]: streak for tier, streak in self.manager.pity.streak.items()
+            },
+        }
+    
+    async def handle_metrics(self, query: Dict[str, str]):
+        # Shared openings only; session views keep no counters
+        telemetry = self.manager.telemetry
+        snapshot = telemetry.snapshot(reset=query.get("reset", "0").lower() in ("1", "true", "yes"))
+        if query.get("format") == "json":
+            return telemetry.to_dict(snapshot)
+        return telemetry.to_text(snapshot)
+
+async def serve(manager: ProblemManager, host: str, port: int):
+    server = CaseServer(manager)
+    listener = await server.start(host, port)
+    print(f"Serving {manager.get_problem_count()} problems on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless LeetCode case-opening server")
+    parser.add_argument("--file", default="learned.txt", help="problem file to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int, default=None, help="root seed for reproducible tiers and sessions")
+    parser.add_argument("--history", action="store_true", help="log shared openings to <file>.history")
+    parser.add_argument("--pity", action="store_true", help="boost Covert and Gold odds after long dry streaks")
+    parser.add_argument("--weighted", action="store_true", help="favor problems that have not come up recently")
+    args = parser.parse_args()
+    manager = ProblemManager(args.file, seed=args.seed)
+    if args.history or args.pity:
+        manager.enable_history(pity=args.pity)
+    if args.weighted:
+        manager.enable_weighted()
+    try:
+        asyncio.run(serve(manager, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Headless Monte Carlo audit of ProblemManager drop rates
+
+Simulates a large number of case openings across a process pool and
+checks the observed tier and problem frequencies against the declared
+TIER_PROBABILITIES. Each worker gets an independent RNG stream spawned
+from one seed and draws in vectorized batches.
+
+    python drop_rate_audit.py --opens 200000000 --workers 1,2,4,8
+"""
+import argparse
+import math
+import time
+from multiprocessing import Pool
+from typing import List, Tuple
+
+import numpy as np
+
+from problem_manager import ProblemManager, TierSampler, TIERS, TIER_PROBABILITIES
+from rng_stream import RngStream
+
+_worker_sampler = None  # TierSampler built once per worker process
+
+def _init_worker(tier_members: List[List[int]]):
+    global _worker_sampler
+    _worker_sampler = TierSampler(tier_members)
+
+def _run_worker(task: Tuple[int, int, np.random.SeedSequence]) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Simulate `opens` openings in batches; returns tier counts, problem counts, seconds"""
+    opens, batch_size, seed = task
+    sampler = _worker_sampler
+    sampler.rng = RngStream(seed).generator
+    tier_counts = np.zeros(len(TIERS), dtype=np.int64)
+    problem_counts = np.zeros(sampler.problem_count, dtype=np.int64)
+
+    start = time.perf_counter()
+    remaining = opens
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        tiers, problems = sampler.draw_many(n)
+        tier_counts += np.bincount(tiers, minlength=len(TIERS))
+        problem_counts += np.bincount(problems, minlength=sampler.problem_count)
+        remaining -= n
+    return tier_counts, problem_counts, time.perf_counter() - start
+
+def simulate(tier_members: List[List[int]], opens: int, workers: int,
+             batch_size: int = 1_000_000, seed: int = None) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Run `opens` simulated openings over `workers` processes and merge the counts"""
+    streams = [stream.seed_sequence for stream in RngStream(seed).spawn(workers)]
+    shares = [opens // workers + (1 if i < opens % workers else 0) for i in range(workers)]
+    tasks = [(share, batch_size, stream) for share, stream in zip(shares, streams)]
+
+    start = time.perf_counter()
+    with Pool(workers, initializer=_init_worker, initargs=(tier_members,)) as pool:
+        results = pool.map(_run_worker, tasks)
+    elapsed = time.perf_counter() - start
+
+    tier_counts = sum(result[0] for result in results)
+    problem_counts = sum(result[1] for result in results)
+    return tier_counts, problem_counts, elapsed
+
+def chi2_sf(x: float, df: int) -> float:
+    """Survival function of the chi-square distribution (p-value)"""
+    if x <= 0:
+        return 1.0
+    if df > 100:
+        # Wilson-Hilferty normal approximation for large df
+        z = ((x / df) ** (1 / 3) - (1 - 2 / (9 * df))) / math.sqrt(2 / (9 * df))
+        return 0.5 * math.erfc(z / math.sqrt(2))
+    # Regularized upper incomplete gamma Q(df/2, x/2) via the lower series
+    s, y = df / 2, x / 2
+    term = total = 1 / s
+    n = 1
+    while term > total * 1e-15 and n < 10_000:
+        term *= y / (s + n)
+        total += term
+        n += 1
+    lower = total * math.exp(s * math.log(y) - y - math.lgamma(s))
+    return max(0.0, 1.0 - lower)
+
+def chi_square(observed: np.ndarray, expected_p: np.ndarray) -> Tuple[float, int, float]:
+    """Pearson chi-square of counts against expected probabilities; returns (stat, df, p)"""
+    expected = expected_p * observed.sum()
+    mask = expected > 0
+    stat = float((((observed[mask] - expected[mask]) ** 2) / expected[mask]).sum())
+    df = int(mask.sum()) - 1
+    return stat, df, chi2_sf(stat, df)
+
+def wilson_interval(hits: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score confidence interval for a binomial proportion"""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return center - spread, center + spread
+
+def expected_problem_rates(sampler: TierSampler, tier_p: np.ndarray) -> np.ndarray:
+    """Per-problem draw probability implied by the tier table and tier windows"""
+    rates = np.zeros(sampler.problem_count, dtype=np.float64)
+    for tier, p in enumerate(tier_p):
+        size = sampler.sizes[tier]
+        if size:
+            window = sampler.members[sampler.offsets[tier]:sampler.offsets[tier] + size]
+            rates[window] += p / size
+    return rates
+
+def report(tier_counts: np.ndarray, problem_counts: np.ndarray, sampler: TierSampler):
+    """Print per-tier rates with confidence intervals and chi-square tests"""
+    opens = int(tier_counts.sum())
+    declared = np.array([TIER_PROBABILITIES[tier] for tier in TIERS], dtype=np.float64)
+    tier_p = declared / declared.sum()
+
+    print(f"\n{'Tier':<26}{'Declared %':>12}{'Observed %':>12}{'95% CI':>24}  OK")
+    for tier, p, hits in zip(TIERS, tier_p, tier_counts):
+        low, high = wilson_interval(int(hits), opens)
+        ok = "yes" if low <= p <= high else "NO"
+        print(f"{tier:<26}{p * 100:>12.4f}{hits / opens * 100:>12.4f}"
+              f"{f'[{low * 100:.4f}, {high * 100:.4f}]':>24}  {ok}")
+
+    stat, df, p_value = chi_square(tier_counts, tier_p)
+    print(f"\nTier chi-square: {stat:.3f} (df={df}), p = {p_value:.4f}")
+
+    if sampler.problem_count:
+        expected = expected_problem_rates(sampler, tier_p)
+        stat, df, p_value = chi_square(problem_counts, expected)
+        print(f"Problem chi-square: {stat:.3f} (df={df}), p = {p_value:.4f}")
+
+def report_fallbacks(tier_members: List[List[int]]):
+    """Name tiers that are empty and therefore draw from the whole catalog"""
+    empty = [tier for tier, members in zip(TIERS, tier_members) if not len(members)]
+    if empty:
+        print(f"Empty tiers falling back to any problem: {', '.join(empty)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo audit of case drop rates")
+    parser.add_argument("--file", default="learned.txt", help="problem file to audit")
+    parser.add_argument("--opens", type=int, default=10_000_000, help="simulated openings per run")
+    parser.add_argument("--workers", default="1", help="comma-separated worker counts to benchmark")
+    parser.add_argument("--batch", type=int, default=1_000_000, help="openings per vectorized batch")
+    parser.add_argument("--seed", type=int, default=None, help="root seed for the RNG streams")
+    args = parser.parse_args()
+
+    manager = ProblemManager(args.file)
+    tier_members = manager.tier_members
+    print(f"Auditing {manager.get_problem_count()} problems from {args.file}, "
+          f"{args.opens:,} openings per run")
+
+    results = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        results = simulate(tier_members, args.opens, workers, args.batch, args.seed)
+        print(f"workers={workers:<3} {args.opens / results[2]:>16,.0f} opens/sec ({results[2]:.2f}s)")
+
+    tier_counts, problem_counts, _ = results
+    report(tier_counts, problem_counts, TierSampler(tier_members))
+    report_fallbacks(tier_members)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import json
+import time
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+class DropTelemetry:
+    """Counters for what open_case actually hands out
+    
+    Everything lives in preallocated integer arrays indexed by tier and by
+    problem id, so recording one opening is a few array increments with no
+    dict or string allocation. The problem array grows geometrically when
+    problems are added. snapshot() freezes a copy for export, and reset()
+    (or snapshot(reset=True)) starts a new counting window.
+    """
+    
+    def __init__(self, tiers: Sequence[str], problem_count: int = 0):
+        self.tiers = list(tiers)
+        self.tier_counts = np.zeros(len(self.tiers), dtype=np.int64)
+        self.fallback_counts = np.zeros(len(self.tiers), dtype=np.int64)  # Draws from an empty tier
+        self.problem_counts = np.zeros(max(16, problem_count), dtype=np.int64)
+        self.problem_count = problem_count  # Ids in use; the array may be larger
+        self.opens = 0
+        self.since = time.time()
+    
+    def resize(self, problem_count: int):
+        """Make room for problem ids up to problem_count - 1"""
+        if problem_count > len(self.problem_counts):
+            grown = np.zeros(max(problem_count, 2 * len(self.problem_counts)), dtype=np.int64)
+            grown[:len(self.problem_counts)] = self.problem_counts
+            self.problem_counts = grown
+        self.problem_count = problem_count
+    
+    def record(self, tier: int, problem_id: int, fallback: bool = False):
+        """Count one opening"""
+        self.opens += 1
+        self.tier_counts[tier] += 1
+        self.problem_counts[problem_id] += 1
+        if fallback:
+            self.fallback_counts[tier] += 1
+    
+    def record_many(self, tiers: np.ndarray, problem_ids: np.ndarray, fallbacks: Optional[np.ndarray] = None):
+        """Count a batch of openings from TierSampler.draw_many"""
+        self.opens += len(tiers)
+        self.tier_counts += np.bincount(tiers, minlength=len(self.tiers))
+        np.add.at(self.problem_counts, problem_ids, 1)
+        if fallbacks is not None and fallbacks.any():
+            self.fallback_counts += np.bincount(tiers[fallbacks], minlength=len(self.tiers))
+    
+    def reset_problems(self):
+        """Zero the per-problem counters, e.g. after problem ids were renumbered"""
+        self.problem_counts[:] = 0
+    
+    def reset(self):
+        """Zero every counter and start a new window"""
+        self.tier_counts[:] = 0
+        self.fallback_counts[:] = 0
+        self.problem_counts[:] = 0
+        self.opens = 0
+        self.since = time.time()
+    
+    def snapshot(self, reset: bool = False) -> Dict[str, object]:
+        """Copy of the current counters; with reset=True the window restarts"""
+        now = time.time()
+        snapshot = {
+            "since": self.since,
+            "until": now,
+            "opens": self.opens,
+            "tiers": dict(zip(self.tiers, self.tier_counts.tolist())),
+            "fallbacks": dict(zip(self.tiers, self.fallback_counts.tolist())),
+            "problem_counts": self.problem_counts[:self.problem_count].copy(),
+        }
+        if reset:
+            self.reset()
+            self.since = now
+        return snapshot
+    
+    def to_dict(self, snapshot: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+        """JSON-ready snapshot; per-problem counts only list problems drawn at least once"""
+        snapshot = snapshot or self.snapshot()
+        counts = snapshot["problem_counts"]
+        drawn = np.flatnonzero(counts)
+        payload = dict(snapshot)
+        payload["problem_counts"] = dict(zip(drawn.tolist(), counts[drawn].tolist()))
+        return payload
+    
+    def to_json(self, snapshot: Optional[Dict[str, object]] = None) -> str:
+        """JSON export of to_dict()"""
+        return json.dumps(self.to_dict(snapshot))
+    
+    def to_text(self, snapshot: Optional[Dict[str, object]] = None, prefix: str = "case") -> str:
+        """Prometheus-style text export"""
+        snapshot = snapshot or self.snapshot()
+        lines = [
+            f"# HELP {prefix}_opens_total Case openings recorded",
+            f"# TYPE {prefix}_opens_total counter",
+            f"{prefix}_opens_total {snapshot['opens']}",
+            f"# HELP {prefix}_tier_opens_total Openings per tier",
+            f"# TYPE {prefix}_tier_opens_total counter",
+        ]
+        for tier, count in snapshot["tiers"].items():
+            lines.append(f'{prefix}_tier_opens_total{{tier="{tier}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_tier_fallbacks_total Openings whose tier was empty and fell back to any problem",
+            f"# TYPE {prefix}_tier_fallbacks_total counter",
+        ]
+        for tier, count in snapshot["fallbacks"].items():
+            lines.append(f'{prefix}_tier_fallbacks_total{{tier="{tier}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_problem_opens_total Openings per problem id (problems never drawn are omitted)",
+            f"# TYPE {prefix}_problem_opens_total counter",
+        ]
+        counts = snapshot["problem_counts"]
+        drawn = np.flatnonzero(counts)
+        for problem_id, count in zip(drawn.tolist(), counts[drawn].tolist()):
+            lines.append(f'{prefix}_problem_opens_total{{problem_id="{problem_id}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_telemetry_window_start_seconds Unix time the counters were last reset",
+            f"# TYPE {prefix}_telemetry_window_start_seconds gauge",
+            f"{prefix}_telemetry_window_start_seconds {snapshot['since']:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,113 @@
+import json
+import time
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+class FrameProfiler:
+    """Opt-in frame timing for the opening animation
+    
+    Each frame records its wall-clock interval (start to start) and the
+    time spent in each named phase into a fixed-size ring buffer, so a
+    long session never grows memory. Frames slower than the budget are
+    counted as late, and frames that never happened within the opening's
+    duration are counted as dropped.
+    """
+    
+    def __init__(self, phases: Sequence[str] = ("draw", "easing", "audio"), capacity: int = 1024,
+                 budget_ms: float = 1000 / 60, output: Optional[str] = None):
+        """output is a JSON file path, or None to print summaries to stdout"""
+        self.phases = list(phases)
+        self._columns = {phase: i + 1 for i, phase in enumerate(self.phases)}
+        self.capacity = capacity
+        self.budget_ms = budget_ms
+        self.output = output
+        # Columns: frame interval, then one column per phase (all in ms)
+        self.samples = np.zeros((capacity, len(self.phases) + 1), dtype=np.float64)
+        self.count = 0  # Frames recorded since begin_opening (may exceed capacity)
+        self.late_frames = 0
+        self.duration_ms = 0.0
+        self._opening_start = None
+        self._frame_start = None
+        self._mark = None
+        self._row = None
+    
+    def begin_opening(self, duration_ms: float):
+        """Reset counters at the start of an opening"""
+        self.count = 0
+        self.late_frames = 0
+        self.duration_ms = duration_ms
+        self._opening_start = time.perf_counter()
+        self._frame_start = self._opening_start
+    
+    def begin_frame(self):
+        """Start timing a frame"""
+        now = time.perf_counter()
+        self._row = self.samples[self.count % self.capacity]
+        self._row[:] = 0.0
+        self._row[0] = (now - self._frame_start) * 1000
+        if self.count and self._row[0] > self.budget_ms * 1.5:
+            self.late_frames += 1
+        self._frame_start = now
+        self._mark = now
+    
+    def mark(self, phase: str):
+        """Charge the time since the previous mark to a phase"""
+        now = time.perf_counter()
+        self._row[self._columns[phase]] += (now - self._mark) * 1000
+        self._mark = now
+    
+    def end_frame(self):
+        """Finish the current frame"""
+        self.count += 1
+    
+    def summary(self) -> Dict[str, object]:
+        """Percentiles, late/dropped frame counts and the worst phase"""
+        rows = self.samples[:min(self.count, self.capacity)]
+        # The first interval measures time-to-first-frame, not pacing
+        intervals = rows[1:, 0] if len(rows) > 1 else rows[:, 0]
+        elapsed_ms = (time.perf_counter() - self._opening_start) * 1000 if self._opening_start else 0.0
+        expected = int(min(self.duration_ms, elapsed_ms) / self.budget_ms)
+        result = {
+            "frames": self.count,
+            "late_frames": self.late_frames,
+            "dropped_frames": max(0, expected - self.count),
+            "budget_ms": round(self.budget_ms, 3),
+            "frame_ms": self._percentiles(intervals),
+            "phases_ms": {},
+            "worst_phase": None,
+        }
+        worst = -1.0
+        for i, phase in enumerate(self.phases):
+            stats = self._percentiles(rows[:, 1 + i])
+            result["phases_ms"][phase] = stats
+            if stats["p95"] > worst:
+                worst = stats["p95"]
+                result["worst_phase"] = phase
+        return result
+    
+    @staticmethod
+    def _percentiles(values: np.ndarray) -> Dict[str, float]:
+        if not len(values):
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(values.max()), 3),
+        }
+    
+    def dump(self):
+        """Write the summary to the JSON output file, or print it"""
+        summary = self.summary()
+        if self.output:
+            with open(self.output, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            return
+        frame = summary["frame_ms"]
+        print(
+            f"Opening: {summary['frames']} frames, {summary['late_frames']} late, "
+            f"{summary['dropped_frames']} dropped | frame p50 {frame['p50']:.1f} ms, "
+            f"p95 {frame['p95']:.1f} ms, p99 {frame['p99']:.1f} ms | "
+            f"worst phase: {summary['worst_phase']}"
+        )
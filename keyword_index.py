@@ -0,0 +1,156 @@
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from problem_table import ProblemTable
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+RANGE_PATTERN = re.compile(r"(?<![0-9])([0-9]+)\s*[-–]\s*([0-9]+)(?![0-9])")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric runs: "Two Sum II - Input Array" -> two, sum, ii, input, array"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class ProblemFilter:
+    """Which problems a filtered opening may draw
+    
+    A problem matches when its title contains every keyword (as a whole
+    token, case-insensitive) and its LeetCode number is inside the
+    numbers range, if one is given. Filters are normalized, so equal
+    filters hash alike and share a cache entry.
+    """
+    
+    __slots__ = ("keywords", "numbers")
+    
+    def __init__(self, keywords: Iterable[str] = (), numbers: Optional[Tuple[int, int]] = None):
+        self.keywords = tuple(sorted({token for keyword in keywords for token in tokenize(keyword)}))
+        self.numbers = numbers  # Inclusive (low, high) problem number range, or None
+    
+    @classmethod
+    def parse(cls, text: str) -> "ProblemFilter":
+        """Parse a filter string such as "sliding window 1-300"
+        
+        Number ranges (a lone number is a range of one) bound the problem
+        number, everything else is a keyword; every part must match.
+        """
+        low, high = 0, None
+        for start, end in RANGE_PATTERN.findall(text):
+            low, high = max(low, int(start)), int(end) if high is None else min(high, int(end))
+        keywords = []
+        for term in RANGE_PATTERN.sub(" ", text).split():
+            if term.isascii() and term.isdigit():
+                low, high = max(low, int(term)), int(term) if high is None else min(high, int(term))
+            else:
+                keywords.append(term)
+        return cls(keywords, None if high is None else (low, high))
+    
+    @property
+    def key(self) -> Tuple[Tuple[str, ...], Optional[Tuple[int, int]]]:
+        return self.keywords, self.numbers
+    
+    def __bool__(self) -> bool:
+        return bool(self.keywords) or self.numbers is not None
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ProblemFilter) and self.key == other.key
+    
+    def __hash__(self) -> int:
+        return hash(self.key)
+    
+    def __str__(self) -> str:
+        parts = list(self.keywords)
+        if self.numbers is not None:
+            parts.append(f"{self.numbers[0]}-{self.numbers[1]}")
+        return " ".join(parts)
+    
+    def __repr__(self) -> str:
+        return f"ProblemFilter({self.keywords!r}, {self.numbers!r})"
+
+def as_filter(problem_filter: Union[str, ProblemFilter, None]) -> Optional[ProblemFilter]:
+    """A ProblemFilter from a filter string or filter; None if it matches everything"""
+    if isinstance(problem_filter, str):
+        problem_filter = ProblemFilter.parse(problem_filter)
+    return problem_filter or None
+
+class KeywordIndex:
+    """Inverted index from title tokens and LeetCode numbers to problem ids
+    
+    Each token maps to the ids of the problems whose title contains it,
+    in ascending order: a bare int while only one problem has it (most
+    rare tokens), an array('I') after that. Numbers are kept as one
+    sorted NumPy column, so a range is two binary searches. The table is
+    append-only, so update() only indexes the problems added since the
+    last call.
+    """
+    
+    def __init__(self, table: ProblemTable):
+        self.table = table
+        self.postings: Dict[str, Union[int, array]] = {}
+        self.count = 0  # Problems indexed so far
+        self._by_number = None  # (sorted numbers, problem ids in that order), rebuilt after growth
+    
+    def update(self):
+        """Index problems added to the table since the last update"""
+        table = self.table
+        if self.count == len(table):
+            return
+        postings = self.postings
+        titles = table.titles
+        findall = TOKEN_PATTERN.findall
+        for problem_id in range(self.count, len(table)):
+            for token in set(findall(titles[problem_id].lower())):
+                current = postings.get(token)
+                if current is None:
+                    postings[token] = problem_id
+                elif type(current) is int:
+                    postings[token] = array('I', (current, problem_id))
+                else:
+                    current.append(problem_id)
+        self.count = len(table)
+        self._by_number = None
+    
+    def token_ids(self, token: str) -> np.ndarray:
+        """Sorted ids of the problems whose title contains token"""
+        # Copied, so the posting array can keep growing while results are alive
+        return self._posting(token).copy()
+    
+    def _posting(self, token: str) -> np.ndarray:
+        """A token's ids without copying; only valid until the next update()"""
+        current = self.postings.get(token)
+        if current is None:
+            return np.zeros(0, dtype=np.uint32)
+        if type(current) is int:
+            return np.array([current], dtype=np.uint32)
+        return np.frombuffer(current, dtype=np.uint32)
+    
+    def number_ids(self, low: int, high: int) -> np.ndarray:
+        """Sorted ids of the problems numbered low..high (inclusive)"""
+        if self._by_number is None:
+            numbers = self.table.number_array()[:self.count]
+            order = np.argsort(numbers, kind="stable")
+            self._by_number = (numbers[order], order.astype(np.uint32))
+        numbers, order = self._by_number
+        start = np.searchsorted(numbers, low, side="left")
+        end = np.searchsorted(numbers, high, side="right")
+        return np.sort(order[start:end])
+    
+    def resolve(self, problem_filter: ProblemFilter) -> np.ndarray:
+        """Sorted ids of every problem matching the filter
+        
+        Starts from the rarest term and keeps the ids that a binary search
+        finds in each longer posting list, so the work is about
+        O(rarest * log(longest)) rather than proportional to the catalog.
+        """
+        matches = [self._posting(keyword) for keyword in problem_filter.keywords]
+        if problem_filter.numbers is not None:
+            matches.append(self.number_ids(*problem_filter.numbers))
+        if not matches:
+            return np.arange(self.count, dtype=np.uint32)
+        matches.sort(key=len)
+        result = matches[0].copy()
+        for ids in matches[1:]:
+            if not len(result):
+                break
+            found = np.minimum(np.searchsorted(ids, result), len(ids) - 1)
+            result = result[ids[found] == result]
+        return result
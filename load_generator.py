@@ -0,0 +1,70 @@
+"""Load generator for case_server.py
+
+Opens many concurrent keep-alive connections to a running server and
+reports throughput and latency percentiles:
+
+    python load_generator.py --clients 2000 --requests 50 --path /open
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import numpy as np
+
+async def run_client(host: str, port: int, path: str, requests: int,
+                     latencies: List[float], errors: List[int]):
+    """One client sending `requests` sequential requests on a single connection"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        errors.append(requests)
+        return
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1")
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(1)
+    except (OSError, asyncio.IncompleteReadError):
+        errors.append(1)
+    finally:
+        writer.close()
+
+async def run_load(host: str, port: int, path: str, clients: int, requests: int):
+    latencies: List[float] = []
+    errors: List[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(host, port, path, requests, latencies, errors) for _ in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    
+    print(f"{clients} clients x {requests} requests to {path}")
+    print(f"completed {len(latencies):,} requests in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} req/s), {sum(errors)} errors")
+    if latencies:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        print(f"latency p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms, "
+              f"max {max(latencies) * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for case_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--path", default="/open", help="request path, e.g. /open/batch?count=100")
+    parser.add_argument("--clients", type=int, default=1000, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=20, help="requests per connection")
+    args = parser.parse_args()
+    asyncio.run(run_load(args.host, args.port, args.path, args.clients, args.requests))
+
+if __name__ == "__main__":
+    main()
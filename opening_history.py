@@ -0,0 +1,188 @@
+import hashlib
+import os
+import struct
+import time
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+# History file layout (little-endian):
+#   header: magic, version, record size
+#   then:   fixed-width records of timestamp (float64 seconds), problem key
+#           (uint32, see problem_key), tier id (uint8, TIERS order), 3 pad
+#           bytes, seed (uint64)
+HISTORY_MAGIC = b"LCOHIST\0"
+HISTORY_VERSION = 2
+HISTORY_HEADER = struct.Struct("<8sHH4x")
+HISTORY_RECORD = struct.Struct("<dIB3xQ")
+HISTORY_DTYPE = np.dtype({
+    "names": ["timestamp", "problem_key", "tier", "seed"],
+    "formats": ["<f8", "<u4", "u1", "<u8"],
+    "offsets": [0, 8, 12, 16],
+    "itemsize": HISTORY_RECORD.size,
+})
+HISTORY_SUFFIX = ".history"
+
+def problem_key(problem: str) -> int:
+    """Stable 32-bit key for a problem line
+    
+    Table ids change whenever a reload renumbers problems, so the log
+    identifies problems by a hash of their text instead.
+    """
+    return int.from_bytes(hashlib.blake2b(problem.encode("utf-8"), digest_size=4).digest(), "little")
+
+class OpeningHistory:
+    """Append-only log of openings, read back through a memory map
+    
+    Records are fixed width, so record i lives at a known offset and the
+    whole log reads as one NumPy structured array without parsing. The
+    index of the latest record of each tier is kept in memory, so "opens
+    since the last Gold" never rescans the file.
+    """
+    
+    def __init__(self, path: str, tier_count: int):
+        self.path = path
+        self.tier_count = tier_count
+        self.last_seen = np.full(tier_count, -1, dtype=np.int64)  # Record index of each tier's latest drop
+        self._view = None
+        self._view_count = 0
+        
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as f:
+                f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, HISTORY_RECORD.size))
+        with open(path, 'rb') as f:
+            magic, version, record_size = HISTORY_HEADER.unpack(f.read(HISTORY_HEADER.size))
+        if magic == HISTORY_MAGIC and version == 1:
+            # Version 1 logged table ids, which reloads renumber; set it aside
+            os.replace(path, path + ".v1")
+            print(f"Warning: moved the old-format history to {path}.v1 and started a new one")
+            with open(path, 'wb') as f:
+                f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, HISTORY_RECORD.size))
+            magic, version, record_size = HISTORY_MAGIC, HISTORY_VERSION, HISTORY_RECORD.size
+        if magic != HISTORY_MAGIC or version != HISTORY_VERSION or record_size != HISTORY_RECORD.size:
+            raise ValueError(f"{path} is not a version {HISTORY_VERSION} opening history")
+        
+        # A crash mid-append can leave a torn last record; drop it
+        size = os.path.getsize(path) - HISTORY_HEADER.size
+        self.count = size // HISTORY_RECORD.size
+        if size % HISTORY_RECORD.size:
+            os.truncate(path, HISTORY_HEADER.size + self.count * HISTORY_RECORD.size)
+        
+        tiers = self.records()["tier"]
+        for tier in range(tier_count):
+            hits = np.flatnonzero(tiers == tier)
+            if len(hits):
+                self.last_seen[tier] = hits[-1]
+        self._file = open(path, 'ab')
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, problem_key: int, tier: int, seed: int = 0, timestamp: Optional[float] = None):
+        """Record one opening"""
+        self._file.write(HISTORY_RECORD.pack(
+            time.time() if timestamp is None else timestamp, problem_key, tier, seed
+        ))
+        self._file.flush()
+        self.last_seen[tier] = self.count
+        self.count += 1
+    
+    def append_many(self, problem_keys: np.ndarray, tiers: np.ndarray, seed: int = 0):
+        """Record a batch of openings that share one timestamp"""
+        batch = np.zeros(len(tiers), dtype=HISTORY_DTYPE)
+        batch["timestamp"] = time.time()
+        batch["problem_key"] = problem_keys
+        batch["tier"] = tiers
+        batch["seed"] = seed
+        self._file.write(batch.tobytes())
+        self._file.flush()
+        for tier in range(self.tier_count):
+            hits = np.flatnonzero(tiers == tier)
+            if len(hits):
+                self.last_seen[tier] = self.count + hits[-1]
+        self.count += len(tiers)
+    
+    def records(self) -> np.ndarray:
+        """Every record as a read-only structured array backed by the file"""
+        if self.count == 0:
+            return np.zeros(0, dtype=HISTORY_DTYPE)
+        if self._view is None or self._view_count != self.count:
+            self._view = np.memmap(
+                self.path, dtype=HISTORY_DTYPE, mode='r',
+                offset=HISTORY_HEADER.size, shape=(self.count,)
+            )
+            self._view_count = self.count
+        return self._view
+    
+    def recent(self, n: int) -> np.ndarray:
+        """The last n records, oldest first"""
+        return self.records()[max(0, self.count - n):]
+    
+    def opens_since(self, tier: int, or_rarer: bool = False) -> int:
+        """Openings since the last drop of `tier` (or of any rarer tier)
+        
+        Counts the whole log if the tier never dropped.
+        """
+        last = self.last_seen[tier:].max() if or_rarer else self.last_seen[tier]
+        return int(self.count - 1 - last)
+    
+    def tier_counts(self, last_n: Optional[int] = None) -> np.ndarray:
+        """Drops per tier over the last last_n openings (or the whole log)"""
+        tiers = self.records()["tier"] if last_n is None else self.recent(last_n)["tier"]
+        return np.bincount(tiers, minlength=self.tier_count)
+    
+    def close(self):
+        self._file.close()
+        self._view = None
+
+class PityTimer:
+    """CS:GO-style pity: rarer tiers get likelier during long dry streaks
+    
+    rules maps a tier index to (soft_start, hard_limit). streak[t] counts
+    openings since a drop of tier t or rarer. From soft_start on, each
+    opening first rolls a boost for t that ramps linearly from 0 to 1 at
+    hard_limit, so a drop of t is guaranteed by then. Every step is a few
+    integer updates per rule, independent of how long the history is.
+    """
+    
+    def __init__(self, rules: Dict[int, Tuple[int, int]]):
+        self.rules = dict(sorted(rules.items(), reverse=True))  # Rarest first
+        self.streak = {tier: 0 for tier in self.rules}
+    
+    def restore(self, history: OpeningHistory):
+        """Pick the streaks up from an existing history"""
+        for tier in self.rules:
+            self.streak[tier] = history.opens_since(tier, or_rarer=True)
+    
+    def boost(self, tier: int) -> float:
+        """Extra chance of forcing `tier` on the next opening"""
+        soft_start, hard_limit = self.rules[tier]
+        streak = self.streak[tier] + 1  # Counting the opening about to happen
+        if streak < soft_start:
+            return 0.0
+        return min(1.0, (streak - soft_start + 1) / (hard_limit - soft_start + 1))
+    
+    def draw_tier(self, rng: np.random.Generator) -> Optional[int]:
+        """A tier forced by pity for this opening, or None to draw normally
+        
+        Only consumes random numbers while some streak is past soft_start.
+        """
+        for tier in self.rules:
+            boost = self.boost(tier)
+            if boost and rng.random() < boost:
+                return tier
+        return None
+    
+    def observe(self, tier: int):
+        """Update the streaks after an opening"""
+        for pity_tier in self.streak:
+            self.streak[pity_tier] = 0 if tier >= pity_tier else self.streak[pity_tier] + 1
+    
+    def observe_many(self, tiers: Sequence[int]):
+        """Update the streaks after a batch of openings"""
+        tiers = np.asarray(tiers)
+        for pity_tier in self.streak:
+            hits = np.flatnonzero(tiers >= pity_tier)
+            if len(hits):
+                self.streak[pity_tier] = int(len(tiers) - 1 - hits[-1])
+            else:
+                self.streak[pity_tier] += len(tiers)
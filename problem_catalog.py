@@ -0,0 +1,151 @@
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from problem_manager import ProblemManager, TierSampler, TIERS, TIER_COLORS, tier_targets
+from problem_table import ProblemTable
+from rng_stream import RngStream
+
+def index_dtype(count: int) -> np.dtype:
+    """Smallest unsigned integer type that can hold ids 0..count-1"""
+    if count <= 1 << 8:
+        return np.dtype(np.uint8)
+    if count <= 1 << 16:
+        return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+class ProblemCatalog:
+    """Read-only problem table shared by every session
+    
+    Holds the problem table (and with it the problem -> id index) exactly
+    once. Nothing mutates a catalog after construction; a reload builds a
+    new one, and sessions created from the old catalog keep using it.
+    """
+    
+    __slots__ = ("problems",)
+    
+    def __init__(self, problems: Sequence[str]):
+        """problems is a ProblemTable, used as-is, or any sequence of problem lines"""
+        self.problems = problems if isinstance(problems, ProblemTable) else ProblemTable(problems)
+    
+    @classmethod
+    def from_manager(cls, manager: ProblemManager) -> "ProblemCatalog":
+        """Snapshot a ProblemManager's problems (its table keeps growing on reload)"""
+        return cls(manager.problems.copy())
+    
+    def __len__(self) -> int:
+        return len(self.problems)
+    
+    def get_problem(self, problem_id: int) -> str:
+        """Get the problem text for an id"""
+        return self.problems[problem_id]
+    
+    def get_problem_id(self, problem: str) -> Optional[int]:
+        """Get the id of a problem, or None if it is not in the catalog"""
+        return self.problems.get_id(problem)
+    
+    def new_view(self, seed=None) -> "SessionView":
+        """A session with its own random tier assignment (seed: int or RngStream)"""
+        return SessionView.random(self, seed)
+
+class SessionView:
+    """One session's tier assignment over a shared ProblemCatalog
+    
+    The whole assignment is a single permutation of problem ids, stored
+    in the smallest integer type that fits, with tiers laid out back to
+    back in TIERS order (counts[t] ids each). Overrides pin individual
+    problems to another tier. The catalog itself is never copied, so a
+    session costs a few bytes per problem plus a small fixed overhead.
+    """
+    
+    __slots__ = ("catalog", "order", "counts", "overrides", "sampler", "_tier_of", "_shuffled_tiers")
+    
+    def __init__(self, catalog: ProblemCatalog, order: np.ndarray, counts: Sequence[int], seed=None):
+        self.catalog = catalog
+        self.order = order
+        self.counts = list(counts)
+        self.overrides: Dict[int, int] = {}  # problem id -> tier index
+        self._shuffled_tiers: Dict[int, int] = {}  # Tier each overridden problem was shuffled into
+        self.sampler = TierSampler.from_order(order, self.counts, seed)
+        self._tier_of = None  # problem id -> tier index, built on first lookup
+    
+    @classmethod
+    def random(cls, catalog: ProblemCatalog, seed=None) -> "SessionView":
+        """Shuffle the catalog into tiers with the 50/30/15/5 split"""
+        rng = (seed if isinstance(seed, RngStream) else RngStream(seed)).generator
+        order = rng.permutation(len(catalog)).astype(index_dtype(len(catalog)))
+        return cls(catalog, order, tier_targets(len(catalog)), rng)
+    
+    @classmethod
+    def from_tier_members(cls, catalog: ProblemCatalog, tier_members: List[List[int]], seed=None) -> "SessionView":
+        """Adopt an existing assignment, e.g. ProblemManager.tier_members"""
+        dtype = index_dtype(len(catalog))
+        order = np.concatenate([np.asarray(members, dtype=dtype) for members in tier_members])
+        return cls(catalog, order, [len(members) for members in tier_members], seed)
+    
+    def _tiers(self) -> np.ndarray:
+        if self._tier_of is None:
+            tier_of = np.empty(len(self.order), dtype=np.uint8)
+            tier_of[self.order] = np.repeat(np.arange(len(TIERS), dtype=np.uint8), self.counts)
+            self._tier_of = tier_of
+        return self._tier_of
+    
+    def open_case(self) -> Tuple[str, str]:
+        """Open a case and return a random problem based on CS:GO tier probabilities"""
+        if not len(self.catalog):
+            return "No problems available", "Mil-Spec (Blue)"
+        tier_index, problem_id = self.sampler.draw()
+        return self.catalog.problems[problem_id], TIERS[tier_index]
+    
+    def open_many(self, count: int) -> List[Tuple[str, str]]:
+        """Open count cases in one vectorized draw"""
+        if not len(self.catalog):
+            return []
+        tier_indices, problem_ids = self.sampler.draw_many(count)
+        problems = self.catalog.problems
+        return [(problems[p], TIERS[t]) for t, p in zip(tier_indices.tolist(), problem_ids.tolist())]
+    
+    def get_problem_tier(self, problem: str) -> str:
+        """Get the tier for a specific problem in this session"""
+        problem_id = self.catalog.get_problem_id(problem)
+        if problem_id is None:
+            return "Mil-Spec (Blue)"  # Default
+        return TIERS[self._tiers()[problem_id]]
+    
+    def get_tier_color(self, tier: str) -> str:
+        """Get the color code for a tier"""
+        return TIER_COLORS.get(tier, "#FFFFFF")
+    
+    def set_override(self, problem: str, tier: str):
+        """Pin a problem to a tier for this session only"""
+        problem_id = self.catalog.get_problem_id(problem)
+        if problem_id is None:
+            raise KeyError(f"Unknown problem: {problem}")
+        tier_index = TIERS.index(tier)
+        self._shuffled_tiers.setdefault(problem_id, int(self._tiers()[problem_id]))
+        self.overrides[problem_id] = tier_index
+        self._move(problem_id, tier_index)
+    
+    def clear_override(self, problem: str):
+        """Drop a problem's override; it returns to its shuffled tier"""
+        problem_id = self.catalog.get_problem_id(problem)
+        if self.overrides.pop(problem_id, None) is not None:
+            self._move(problem_id, self._shuffled_tiers.pop(problem_id))
+    
+    def _move(self, problem_id: int, tier_index: int):
+        """Re-lay the permutation out by tier after a problem changes tier"""
+        tier_of = self._tiers()
+        tier_of[problem_id] = tier_index
+        # Stable sort keeps the original shuffle order within each tier
+        self.order = self.order[np.argsort(tier_of[self.order], kind="stable")]
+        self.counts = np.bincount(tier_of, minlength=len(TIERS)).tolist()
+        self.sampler._set_windows(self.order, self.counts)
+    
+    def memory_footprint(self) -> int:
+        """Approximate bytes owned by this session (the catalog is shared)"""
+        size = sys.getsizeof(self) + self.order.nbytes + sys.getsizeof(self.counts)
+        size += sys.getsizeof(self.overrides) + sys.getsizeof(self._shuffled_tiers)
+        size += self.sampler.prob.nbytes + self.sampler.alias.nbytes
+        size += self.sampler.offsets.nbytes + self.sampler.sizes.nbytes
+        if self._tier_of is not None:
+            size += self._tier_of.nbytes
+        return size
@@ -1,5 +1,18 @@
-import random
-from typing import List, Tuple, Dict
+import copy
+import hashlib
+import os
+import struct
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Optional, Sequence, Union
+import numpy as np
+from drop_telemetry import DropTelemetry
+from keyword_index import KeywordIndex, ProblemFilter, as_filter
+from opening_history import HISTORY_SUFFIX, OpeningHistory, PityTimer, problem_key
+from problem_table import ProblemRecord, ProblemSlice, ProblemTable
+from rng_stream import RngStream, generator_for
+from weighted_selection import SpacedRepetition
 
 # CS:GO tier probabilities - Official Valve-confirmed drop rates
 # Based on years of community-verified statistical testing
@@ -20,112 +33,787 @@ TIER_COLORS = {
     "Exceedingly Rare (Gold)": "#FFD700"
 }
 
+TIERS = list(TIER_PROBABILITIES.keys())
+
+# Optional pity timer: (soft_start, hard_limit) openings without a drop of
+# this tier or rarer. Covert-or-better normally drops about 1 in 111
+# openings and Gold 1 in 385, so both only kick in on unlucky streaks.
+PITY_RULES = {
+    "Covert (Red)": (250, 450),
+    "Exceedingly Rare (Gold)": (600, 1000),
+}
+
+# Tier snapshot file layout (little-endian):
+#   header: magic, version, blake2b-256 of the source file up to the end
+#           of its last complete line, problem count, that byte offset,
+#           fingerprint of the seeded stream that drew the tiers (zeros
+#           if unseeded)
+#   then:   one uint8 tier id per problem, one int32 LeetCode number per
+#           problem (-1 if none), and the UTF-8 problem titles joined
+#           with newlines
+SNAPSHOT_MAGIC = b"LCOSNAP\0"
+SNAPSHOT_VERSION = 4
+SNAPSHOT_HEADER = struct.Struct("<8sH32sIQ16s")
+SNAPSHOT_SUFFIX = ".snap"
+
+# Filtered openings keep this many resolved filters (per tier assignment)
+FILTER_CACHE_SIZE = 32
+
+def prefix_hash(f, length: int):
+    """blake2b-256 hash object over the next `length` bytes of an open file
+    
+    Returns None if the file ends first.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    while length:
+        chunk = f.read(min(length, 1 << 20))
+        if not chunk:
+            return None
+        digest.update(chunk)
+        length -= len(chunk)
+    return digest
+
+# Share of the collection assigned to each tier (gold gets the remainder)
+TIER_SHARES = {
+    "Mil-Spec (Blue)": 0.5,
+    "Restricted (Purple)": 0.3,
+    "Classified (Pink)": 0.15,
+    "Covert (Red)": 0.05,
+}
+
+def tier_targets(total: int) -> List[int]:
+    """How many of `total` problems each tier should hold, in TIERS order"""
+    targets = []
+    remaining = total
+    for tier in TIERS[:-1]:
+        # Every tier below gold gets at least one problem while any are left
+        count = min(remaining, max(1, int(total * TIER_SHARES[tier])))
+        targets.append(count)
+        remaining -= count
+    targets.append(remaining)  # Last tier gets remaining problems
+    return targets
+
+class TierSampler:
+    """Alias-method sampler over the tier table (Vose's algorithm)
+    
+    Built once per tier assignment. Picking a tier costs one uniform draw
+    and one comparison no matter how many tiers exist, and draw_many()
+    does the same for n openings as a handful of NumPy array operations.
+    """
+    
+    def __init__(self, tier_members: Sequence[Sequence[int]], seed=None):
+        """tier_members[t] lists the problem indices assigned to TIERS[t]
+        
+        seed is anything np.random.default_rng accepts, including an
+        existing Generator, which is then shared rather than copied.
+        """
+        self.rng = np.random.default_rng(seed)
+        self._build_alias([TIER_PROBABILITIES[tier] for tier in TIERS])
+        sizes = [len(members) for members in tier_members]
+        members = np.concatenate([np.asarray(members, dtype=np.int64) for members in tier_members])
+        self._set_windows(members, sizes)
+    
+    @classmethod
+    def from_order(cls, order: np.ndarray, sizes: Sequence[int], seed=None,
+                   skip_empty: bool = False) -> "TierSampler":
+        """Sampler over problem ids already grouped by tier
+        
+        order holds every tier back to back (sizes[t] ids for TIERS[t]);
+        it is used as-is, without copying. With skip_empty, empty tiers
+        are never drawn and the other tiers' odds are renormalized,
+        instead of an empty tier falling back to every problem.
+        """
+        sampler = cls.__new__(cls)
+        sampler.rng = np.random.default_rng(seed)
+        sampler._build_alias([
+            0.0 if skip_empty and not size else TIER_PROBABILITIES[tier]
+            for tier, size in zip(TIERS, sizes)
+        ])
+        sampler._set_windows(order, sizes)
+        return sampler
+    
+    def _set_windows(self, members: np.ndarray, sizes: Sequence[int]):
+        # All tiers are stored back to back in one index array; each tier is
+        # an (offset, size) window into it. An empty tier falls back to the
+        # whole catalog, like the original open_case did.
+        self.problem_count = int(sum(sizes))
+        self.members = members
+        self.offsets = np.zeros(len(TIERS), dtype=np.int64)
+        self.offsets[1:] = np.cumsum(sizes)[:-1]
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.empty = self.sizes == 0  # Tiers that fall back to the whole catalog
+        self.offsets[self.empty] = 0
+        self.sizes[self.empty] = self.problem_count
+    
+    def _build_alias(self, weights: List[float]):
+        """Build the probability and alias tables from tier weights"""
+        k = len(weights)
+        total = sum(weights)
+        scaled = [w * k / total for w in weights]
+        self.prob = np.ones(k, dtype=np.float64)
+        self.alias = np.arange(k, dtype=np.int64)
+        
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # Leftovers are 1.0 up to rounding error and keep prob 1.0
+    
+    def draw(self, rng: Optional[np.random.Generator] = None) -> Tuple[int, int]:
+        """Draw one opening as (tier index, problem index)
+        
+        rng overrides the sampler's own generator for this draw only.
+        """
+        rng = self.rng if rng is None else rng
+        column = int(rng.integers(len(self.prob)))
+        tier = column if rng.random() < self.prob[column] else int(self.alias[column])
+        pick = int(rng.random() * self.sizes[tier])
+        return tier, int(self.members[self.offsets[tier] + pick])
+    
+    def draw_tier(self, rng: Optional[np.random.Generator] = None) -> int:
+        """Draw a tier index by the tier probabilities alone"""
+        rng = self.rng if rng is None else rng
+        column = int(rng.integers(len(self.prob)))
+        return column if rng.random() < self.prob[column] else int(self.alias[column])
+    
+    def draw_in_tier(self, tier: int, rng: Optional[np.random.Generator] = None) -> int:
+        """Draw a problem index from one tier"""
+        rng = self.rng if rng is None else rng
+        pick = int(rng.random() * self.sizes[tier])
+        return int(self.members[self.offsets[tier] + pick])
+    
+    def draw_many(self, n: int, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw n openings at once as (tier indices, problem indices) arrays"""
+        rng = self.rng if rng is None else rng
+        columns = rng.integers(len(self.prob), size=n)
+        coins = rng.random(n)
+        tiers = np.where(coins < self.prob[columns], columns, self.alias[columns])
+        picks = (rng.random(n) * self.sizes[tiers]).astype(np.int64)
+        return tiers, self.members[self.offsets[tiers] + picks]
+
 class ProblemManager:
-    def __init__(self, learned_file: str = "learned.txt"):
-        self.learned_file = learned_file
-        self.problems = []
-        self.tiered_problems = {}  # Store tier assignments (one tier per problem)
+    def __init__(self, learned_file: Optional[str] = "learned.txt", use_snapshot: bool = True,
+                 problems: Optional[Sequence[str]] = None, seed=None):
+        """Load a problem file, or pass `problems` for an in-memory catalog
+        
+        seed (an int or an RngStream) makes tier assignment and openings
+        reproducible; by default a fresh seed is drawn from the OS. A
+        seeded manager only loads a snapshot whose tiers the same seed drew.
+        """
+        # Every random draw comes from this one stream or a child of it
+        self.rng = seed if isinstance(seed, RngStream) else RngStream(seed)
+        # Tiers get their own child stream, so openings draw the same
+        # whether or not the tiers came from a snapshot
+        self.tier_rng = self.rng.derive("tiers")
+        self.tiers_key = self.tier_rng.fingerprint()  # Stream the current tiers were drawn from
+        self.last_seed = None  # Seed of the most recent opening, for replay
+        self._opening_rng = None  # Generator new_opening handed out for last_seed, until it is used
+        self.telemetry = DropTelemetry(TIERS)  # What open_case/open_many hand out
+        self.history = None  # OpeningHistory, see enable_history
+        self.pity = None  # PityTimer, see enable_history
+        self.weighted = None  # SpacedRepetition picks within tiers, see enable_weighted
+        self.learned_file = None if problems is not None else learned_file
+        # Tier assignments are persisted next to the problem file so that
+        # restarts skip parsing and keep the same tiers
+        self.use_snapshot = use_snapshot and self.learned_file is not None
+        self.snapshot_file = self.learned_file + SNAPSHOT_SUFFIX if self.learned_file else None
+        self.snapshot_dirty = False  # Reloaded since the snapshot was written, see flush_snapshot
+        # Unique problems; a problem's id is its index in the table
+        self.problems = ProblemTable()
+        self.id_epoch = 0  # Bumped whenever a reload renumbers problem ids
+        self.sampler = None  # TierSampler over the current tier assignment
+        self.load_stats = {}  # Filled in by load_problems
+        # Tier assignment: every problem id once, grouped by tier in TIERS
+        # order; tier_members are per-tier views into it
+        self.tier_order = np.zeros(0, dtype=np.uint32)
+        self.tier_sizes = np.zeros(len(TIERS), dtype=np.int64)
+        self.tier_members = [self.tier_order for _ in TIERS]
+        self.tier_of = np.zeros(0, dtype=np.uint8)  # problem id -> tier index
+        self.keyword_index = None  # KeywordIndex, built on the first filtered opening
+        self.filter_samplers = OrderedDict()  # filter -> TierSampler over its matches (None if none), oldest first
+        # Where the last read stopped, so appended lines can be parsed alone
+        self.file_size = 0
+        self.file_mtime = 0
+        self.file_offset = 0
+        self.file_hash = hashlib.blake2b(digest_size=32)  # Running hash of the bytes before file_offset
+        if problems is not None:
+            for problem in problems:
+                problem = problem.strip()
+                if problem:
+                    self.problems.add(problem)
+            self.assign_tiers()
+            return
+        if self.use_snapshot and self.load_snapshot():
+            self.flush_snapshot()  # Takes in any lines appended since
+            return
         self.load_problems()
         self.assign_tiers()  # Assign tiers once on initialization
+        if self.use_snapshot:
+            self.save_snapshot()
     
-    def load_problems(self):
-        """Load problems from learned.txt file"""
+    def load_problems(self, offset: int = 0):
+        """Load problems from learned.txt file
+        
+        The file is streamed one line at a time and duplicate lines are
+        dropped as they are read, so memory tracks the unique problem set
+        rather than the file size. The problem table doubles as the
+        seen-set. With an offset, only lines from that byte onwards are read.
+        Returns the ids of the problems that were added.
+        """
+        start = time.perf_counter()
+        first_new = len(self.problems)
+        lines = duplicates = size = 0
         try:
-            with open(self.learned_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                for line in lines:
-                    line = line.strip()
-                    if line:
-                        self.problems.append(line)
+            with open(self.learned_file, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                f.seek(offset)
+                self.file_offset = offset
+                if not offset:
+                    self.file_hash = hashlib.blake2b(digest_size=32)
+                for raw in f:
+                    lines += 1
+                    size += len(raw)
+                    if raw.endswith(b"\n"):
+                        # Only complete lines advance the offset; a
+                        # partial last line is re-read on the next reload
+                        self.file_offset += len(raw)
+                        self.file_hash.update(raw)
+                    line = raw.decode('utf-8').strip()
+                    if not line:
+                        continue
+                    if not self.problems.add(line)[1]:
+                        duplicates += 1
+                self.file_size = stat.st_size
+                self.file_mtime = stat.st_mtime_ns
         except FileNotFoundError:
             print(f"Warning: {self.learned_file} not found. Creating empty file.")
             with open(self.learned_file, 'w', encoding='utf-8') as f:
                 pass
+        
+        self.load_stats = {
+            "lines": lines,
+            "problems": len(self.problems),
+            "duplicates": duplicates,
+            "bytes": size,
+            "seconds": time.perf_counter() - start,
+        }
+        return list(range(first_new, len(self.problems)))
+    
+    def get_load_stats(self) -> Dict[str, float]:
+        """Get statistics from the last load (lines, duplicates, bytes, seconds)"""
+        return dict(self.load_stats)
+    
+    def copy(self, weighted: Optional[SpacedRepetition] = None) -> "ProblemManager":
+        """Copy that can be reloaded without touching this manager
+        
+        Reloads only ever append to the problem table or replace the
+        tier arrays outright, so the table is the only container that
+        needs copying, plus the spaced-repetition weights, which a reload
+        re-lays out in place. The copy starts with empty telemetry of its
+        own; take_telemetry() carries the counts over when it replaces
+        this manager.
+        
+        Every opening updates the weights, so copying from another thread
+        must pass weighted: a deep copy of self.weighted taken on the
+        thread that opens cases.
+        """
+        clone = copy.copy(self)
+        clone.telemetry = DropTelemetry(TIERS, len(self.problems))
+        clone.problems = self.problems.copy()
+        clone.file_hash = self.file_hash.copy()
+        clone.tier_rng = copy.deepcopy(self.tier_rng)
+        clone.filter_samplers = OrderedDict()
+        if weighted is not None:
+            clone.weighted = weighted
+        elif self.weighted is not None:
+            clone.weighted = copy.deepcopy(self.weighted)
+        return clone
+    
+    def take_telemetry(self, previous: "ProblemManager"):
+        """Adopt the telemetry of the manager this reloaded copy replaces
+        
+        Call from the thread that owns previous, once it stops opening.
+        """
+        telemetry = previous.telemetry
+        if self.id_epoch != previous.id_epoch:
+            telemetry.reset_problems()  # Counted under the old problem ids
+        telemetry.resize(len(self.problems))
+        self.telemetry = telemetry
+    
+    def has_changed(self) -> bool:
+        """Check whether learned.txt changed since it was last read"""
+        if self.learned_file is None:
+            return False  # In-memory catalogs never change on disk
+        try:
+            stat = os.stat(self.learned_file)
+        except FileNotFoundError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) != (self.file_size, self.file_mtime)
+    
+    def reload_problems(self, incremental: bool = False):
+        """Reload problems and reassign tiers (call when learned.txt changes)
+        
+        With incremental=True existing tier assignments are kept: appended
+        lines are parsed on their own, and only new problems are slotted
+        into tiers. Returns the number of problems added. The snapshot is
+        not rewritten here; call flush_snapshot() once edits settle.
+        """
+        if self.learned_file is None:
+            return 0
+        if not incremental:
+            old_problems = self.problems
+            self._forget_problem_ids()
+            self.problems = ProblemTable(previous=old_problems)
+            self.file_offset = 0
+            self.load_problems()
+            self.problems.release_pool()
+            self.assign_tiers()
+            # Problems that were not in the old table, as for incremental reloads
+            added = sum(1 for problem in self.problems if problem not in old_problems)
+        else:
+            if self._is_append_only():
+                new_ids = self.load_problems(self.file_offset)
+            else:
+                new_ids = self._reload_preserving_tiers()
+            self.slot_new_problems(new_ids)
+            added = len(new_ids)
+        
+        self.snapshot_dirty = self.use_snapshot
+        return added
     
-    def reload_problems(self):
-        """Reload problems and reassign tiers (call when learned.txt changes)"""
-        self.problems = []
+    def _forget_problem_ids(self):
+        """Drop per-problem state before a reload renumbers problem ids"""
+        self.id_epoch += 1
+        self.telemetry.reset_problems()
+        if self.weighted is not None:
+            self.weighted.reset()
+    
+    def _is_append_only(self) -> bool:
+        """True if the file only grew: everything up to file_offset is unchanged on disk
+        
+        The whole prefix is re-hashed and checked against the running hash
+        of the bytes that were read, so edits anywhere are caught, not just
+        near the end.
+        """
+        if self.file_offset != self.file_size:
+            return False  # Last read ended mid-line; that line may have grown
+        try:
+            with open(self.learned_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size <= self.file_size:
+                    # Truncated, or rewritten in place (same size, new mtime)
+                    return False
+                digest = prefix_hash(f, self.file_offset)
+        except FileNotFoundError:
+            return False
+        return digest is not None and digest.digest() == self.file_hash.digest()
+    
+    def _reload_preserving_tiers(self) -> List[int]:
+        """Re-read the whole file, keeping the tier of every surviving problem"""
+        old_problems = self.problems
+        old_tier_of = self.tier_of
+        self._forget_problem_ids()
+        self.problems = ProblemTable(previous=old_problems)
+        self.file_offset = 0
         self.load_problems()
-        self.assign_tiers()
+        self.problems.release_pool()
+        
+        # Old id of every problem, -1 for new ones
+        old_ids = np.fromiter(
+            (-1 if old_id is None else old_id for old_id in map(old_problems.get_id, self.problems)),
+            dtype=np.int64, count=len(self.problems)
+        )
+        kept = np.flatnonzero(old_ids >= 0)
+        tier_ids = old_tier_of[old_ids[kept]]
+        # Stable sort keeps each tier in problem id order
+        order = kept[np.argsort(tier_ids, kind="stable")].astype(np.uint32)
+        self._set_tiers(order, np.bincount(tier_ids, minlength=len(TIERS)))
+        return np.flatnonzero(old_ids < 0).tolist()
+    
+    def slot_new_problems(self, new_ids: List[int]):
+        """Add new problems to the tiers furthest below their 50/30/15/5 share"""
+        if not new_ids:
+            return
+        
+        # One open slot per problem a tier is short of its target;
+        # new problems take a random subset of those slots
+        targets = np.array(tier_targets(len(self.problems)))
+        slots = np.repeat(np.arange(len(TIERS)), np.maximum(0, targets - self.tier_sizes))
+        picks = self.tier_rng.generator.choice(len(slots), size=len(new_ids), replace=False)
+        slots = slots[picks]
+        
+        new_ids = np.asarray(new_ids, dtype=np.uint32)
+        self.set_tier_members([
+            np.sort(np.concatenate([members, new_ids[slots == tier]]), kind="stable")
+            for tier, members in enumerate(self.tier_members)
+        ])
     
     def assign_tiers(self):
         """Assign problems to tiers based on rarity - each problem gets ONE tier only"""
-        if not self.problems:
-            self.tiered_problems = {tier: [] for tier in TIER_PROBABILITIES.keys()}
-            return
+        # Shuffle problem indices for random tier assignment
+        shuffled = self.tier_rng.generator.permutation(len(self.problems)).astype(np.uint32)
+        self.tiers_key = self.tier_rng.fingerprint()
+        
+        # Distribute problems across tiers: consecutive runs of the
+        # shuffle, Blue gets most, then purple, pink, red, gold gets least
+        targets = tier_targets(len(shuffled))
+        tier_ids = np.empty(len(shuffled), dtype=np.uint8)
+        tier_ids[shuffled] = np.repeat(np.arange(len(TIERS), dtype=np.uint8), targets)
+        # Each tier is kept in problem id order, the order a snapshot
+        # restores, so the same seed draws the same problems either way
+        self._set_tiers(np.argsort(tier_ids, kind="stable").astype(np.uint32), targets)
+    
+    def flush_snapshot(self):
+        """Write the snapshot if a reload changed things since the last write"""
+        if self.snapshot_dirty:
+            self.save_snapshot()
+    
+    def save_snapshot(self):
+        """Write problems and tier ids to the snapshot file
         
-        # Shuffle problems for random tier assignment
-        shuffled = self.problems.copy()
-        random.shuffle(shuffled)
-        
-        # Calculate how many problems per tier based on probabilities
-        total = len(shuffled)
-        self.tiered_problems = {
-            "Mil-Spec (Blue)": [],
-            "Restricted (Purple)": [],
-            "Classified (Pink)": [],
-            "Covert (Red)": [],
-            "Exceedingly Rare (Gold)": []
+        The digest is the running hash of the bytes that were read, so
+        saving never re-reads the problem file.
+        """
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.file_hash.digest(),
+            len(self.problems), self.file_offset, self.tiers_key
+        )
+        
+        # Write to a temp file and swap it in, so a crash never leaves a
+        # half-written snapshot behind
+        temp_file = self.snapshot_file + ".tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(header)
+                f.write(self.tier_of.tobytes())
+                f.write(self.problems.number_array().astype('<i4').tobytes())
+                f.write("\n".join(self.problems.titles).encode('utf-8'))
+            os.replace(temp_file, self.snapshot_file)
+            self.snapshot_dirty = False
+        except OSError as e:
+            print(f"Warning: could not write {self.snapshot_file}: {e}")
+    
+    def load_snapshot(self) -> bool:
+        """Load problems and tiers from the snapshot if it matches the source
+        
+        Returns False (leaving the manager untouched) when there is no
+        snapshot, it is from another version, its tiers were drawn with
+        another seed, or the part of the source file it was taken from
+        changed. Lines appended since are parsed
+        and slotted into tiers as by an incremental reload.
+        """
+        start = time.perf_counter()
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                magic, version, digest, count, offset, tiers_key = SNAPSHOT_HEADER.unpack(
+                    f.read(SNAPSHOT_HEADER.size)
+                )
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                    return False
+                if self.tier_rng.seeded and tiers_key != self.tier_rng.fingerprint():
+                    return False
+                with open(self.learned_file, 'rb') as source:
+                    file_hash = prefix_hash(source, offset)
+                if file_hash is None or digest != file_hash.digest():
+                    return False
+                tier_ids = np.frombuffer(f.read(count), dtype=np.uint8)
+                numbers = np.frombuffer(f.read(4 * count), dtype='<i4')
+                table = f.read().decode('utf-8')
+            stat = os.stat(self.learned_file)
+        except (OSError, struct.error, UnicodeDecodeError):
+            return False
+        
+        titles = table.split("\n") if count else []
+        if len(titles) != count or len(numbers) != count or len(tier_ids) != count or (
+                count and tier_ids.max() >= len(TIERS)):
+            return False
+        
+        self.problems = ProblemTable.from_columns(array('i', numbers.astype(np.int32).tobytes()), titles)
+        self.file_size = stat.st_size
+        self.file_mtime = stat.st_mtime_ns
+        self.file_offset = offset
+        self.file_hash = file_hash  # Kept to check later appends against
+        self.tiers_key = tiers_key
+        order = np.argsort(tier_ids, kind="stable").astype(np.uint32)
+        self._set_tiers(order, np.bincount(tier_ids, minlength=len(TIERS)))
+        lines = duplicates = 0
+        if stat.st_size > offset:
+            self.slot_new_problems(self.load_problems(offset))
+            lines, duplicates = self.load_stats["lines"], self.load_stats["duplicates"]
+            self.snapshot_dirty = True
+        self.load_stats = {
+            "lines": lines,
+            "problems": len(self.problems),
+            "duplicates": duplicates,
+            "bytes": self.file_size,
+            "seconds": time.perf_counter() - start,
+            "snapshot": True,
         }
+        return True
+    
+    def set_tier_members(self, tier_members: Sequence[Sequence[int]]):
+        """Install a tier assignment given as the problem ids of each tier"""
+        order = np.concatenate([np.asarray(members, dtype=np.uint32) for members in tier_members])
+        self._set_tiers(order, [len(members) for members in tier_members])
+    
+    def _set_tiers(self, order: np.ndarray, sizes: Sequence[int]):
+        """Install a tier assignment and rebuild the lookups derived from it
         
-        # Distribute problems across tiers
-        # Blue gets most, then purple, pink, red, gold gets least
-        tiers = list(TIER_PROBABILITIES.keys())
-        index = 0
+        order holds every problem id once (uint32), sizes[t] of them for
+        TIERS[t] back to back; it is used as-is, without copying.
+        """
+        self.tier_order = order
+        self.tier_sizes = np.asarray(sizes, dtype=np.int64)
+        bounds = np.zeros(len(TIERS) + 1, dtype=np.int64)
+        np.cumsum(self.tier_sizes, out=bounds[1:])
+        self.tier_members = [order[bounds[t]:bounds[t + 1]] for t in range(len(TIERS))]
+        # Problems outside the assignment (only mid-reload) read as Blue
+        self.tier_of = np.zeros(len(self.problems), dtype=np.uint8)
+        self.tier_of[order] = np.repeat(np.arange(len(TIERS), dtype=np.uint8), self.tier_sizes)
+        self.sampler = TierSampler.from_order(order, self.tier_sizes, self.rng.generator)
+        self.filter_samplers = OrderedDict()  # Resolved against the old tiers
+        self.telemetry.resize(len(self.problems))
+        if self.weighted is not None:
+            self.weighted.relayout(self.sampler.members, self.sampler.offsets, self.sampler.sizes)
+    
+    def enable_history(self, path: Optional[str] = None, pity: bool = False):
+        """Log every opening to an append-only history file
         
-        for i, tier in enumerate(tiers):
-            if i == len(tiers) - 1:  # Last tier gets remaining problems
-                self.tiered_problems[tier] = shuffled[index:]
-            else:
-                # Calculate how many problems for this tier
-                # Use a distribution that favors lower tiers
-                if tier == "Mil-Spec (Blue)":
-                    count = max(1, int(total * 0.5))  # 50% to blue
-                elif tier == "Restricted (Purple)":
-                    count = max(1, int(total * 0.3))  # 30% to purple
-                elif tier == "Classified (Pink)":
-                    count = max(1, int(total * 0.15))  # 15% to pink
-                elif tier == "Covert (Red)":
-                    count = max(1, int(total * 0.05))  # 5% to red
-                else:
-                    count = 1  # Gold gets at least 1
-                
-                self.tiered_problems[tier] = shuffled[index:index+count]
-                index += count
-    
-    def open_case(self) -> Tuple[str, str]:
-        """Open a case and return a random problem based on CS:GO tier probabilities"""
-        if not self.problems:
-            return "No problems available", "Mil-Spec (Blue)"
+        The file defaults to one next to the problem file. With pity=True
+        the PITY_RULES streaks are restored from the history and rarer
+        tiers get boosted after long dry streaks.
+        """
+        if path is None:
+            if self.learned_file is None:
+                raise ValueError("in-memory catalogs need an explicit history path")
+            path = self.learned_file + HISTORY_SUFFIX
+        self.history = OpeningHistory(path, len(TIERS))
+        self.pity = None
+        if pity:
+            self.pity = PityTimer({TIERS.index(tier): rule for tier, rule in PITY_RULES.items()})
+            self.pity.restore(self.history)
+    
+    def close(self):
+        """Write a pending snapshot and close the history file (history stops being logged)"""
+        self.flush_snapshot()
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+            self.pity = None
+    
+    def enable_weighted(self, decay: float = 0.25, solved_decay: float = 0.05, recovery_opens: int = 50):
+        """Pick problems within a tier by spaced-repetition weight
         
-        # Select tier based on probabilities
-        rand = random.random() * 100
-        cumulative = 0
-        selected_tier = "Mil-Spec (Blue)"  # Default
+        Tiers are still drawn from the tier table; inside the tier,
+        recently drawn or solved problems are less likely until their
+        weight recovers (see SpacedRepetition).
+        """
+        self.weighted = SpacedRepetition(
+            self.sampler.members, self.sampler.offsets, self.sampler.sizes,
+            decay, solved_decay, recovery_opens
+        )
+    
+    @property
+    def tiered_problems(self) -> Dict[str, ProblemSlice]:
+        """Problem lines of each tier, as read-only views over the problem table"""
+        return {tier: ProblemSlice(self.problems, members) for tier, members in zip(TIERS, self.tier_members)}
+    
+    def mark_solved(self, problem: str) -> bool:
+        """Push a solved problem back in weighted mode; False if unknown"""
+        problem_id = self.problems.get_id(problem)
+        if problem_id is None or self.weighted is None:
+            return False
+        self.weighted.solved(problem_id)
+        return True
+    
+    def get_problem_weight(self, problem: str) -> float:
+        """A problem's spaced-repetition weight (1.0 when not in weighted mode)"""
+        problem_id = self.problems.get_id(problem)
+        if problem_id is None or self.weighted is None:
+            return 1.0
+        return self.weighted.weight(problem_id)
+    
+    def get_keyword_index(self) -> KeywordIndex:
+        """The keyword index, built on first use and caught up with new problems"""
+        if self.keyword_index is None or self.keyword_index.table is not self.problems:
+            self.keyword_index = KeywordIndex(self.problems)  # Problems were renumbered
+        self.keyword_index.update()
+        return self.keyword_index
+    
+    def filter_sampler(self, problem_filter: ProblemFilter) -> Optional["TierSampler"]:
+        """TierSampler over the problems matching a filter, None if nothing matches
         
-        for tier, probability in TIER_PROBABILITIES.items():
-            cumulative += probability
-            if rand <= cumulative:
-                selected_tier = tier
-                break
+        The matches come from the keyword index and are grouped by tier
+        with tier_of, so no problem outside them is looked at. Samplers
+        are cached per filter until the tier assignment changes, which
+        makes repeated filtered openings as cheap as unfiltered ones.
+        Tiers with no matches are left out and the remaining tiers keep
+        their relative odds, so every draw reports the problem's own tier.
+        """
+        cache = self.filter_samplers
+        if problem_filter in cache:
+            cache.move_to_end(problem_filter)
+            return cache[problem_filter]
+        matches = self.get_keyword_index().resolve(problem_filter)
+        sampler = None
+        if len(matches):
+            tiers = self.tier_of[matches]
+            order = matches[np.argsort(tiers, kind="stable")]
+            sampler = TierSampler.from_order(
+                order, np.bincount(tiers, minlength=len(TIERS)), self.rng.generator, skip_empty=True
+            )
+        cache[problem_filter] = sampler
+        while len(cache) > FILTER_CACHE_SIZE:
+            cache.popitem(last=False)
+        return sampler
+    
+    def count_matching(self, problem_filter: Union[str, ProblemFilter, None]) -> int:
+        """How many problems a filter (a ProblemFilter or filter string) matches"""
+        problem_filter = as_filter(problem_filter)
+        if problem_filter is None:
+            return len(self.problems)
+        sampler = self.filter_sampler(problem_filter)
+        return 0 if sampler is None else sampler.problem_count
+    
+    def new_opening(self, seed: Optional[int] = None) -> Tuple[int, np.random.Generator]:
+        """Seed and generator for one opening
         
-        # Get problems for this tier (from pre-assigned tiers)
-        tier_problems = self.tiered_problems.get(selected_tier, [])
+        Each opening draws from its own generator seeded from the manager's
+        stream, and the seed is kept in last_seed. Passing a recorded seed
+        back in replays that opening (result and reel) exactly, as long as
+        the tier assignment is the same. Seeds are logged as uint64, so
+        anything outside 0..2**64 - 1 raises ValueError.
+        """
+        if seed is None:
+            seed = self.rng.next_seed()
+        elif not 0 <= seed < 2**64:
+            raise ValueError(f"seed must be between 0 and {2**64 - 1}")
+        self.last_seed = seed
+        self._opening_rng = generator_for(seed)
+        return seed, self._opening_rng
+    
+    def open_case(self, rng: Optional[np.random.Generator] = None,
+                  filter: Union[str, ProblemFilter, None] = None) -> Tuple[str, str]:
+        """Open a case and return a random problem based on CS:GO tier probabilities
         
-        # If tier has no problems, fall back to any problem
-        if not tier_problems:
-            problem = random.choice(self.problems)
+        Without rng a new opening is seeded (see new_opening). filter (a
+        ProblemFilter or a string like "sliding window 1-300") restricts
+        the draw to matching problems; tiers without a match are skipped
+        and the rest keep their relative odds.
+        """
+        if not self.problems:
+            return "No problems available", "Mil-Spec (Blue)"
+        problem_filter = as_filter(filter)
+        sampler = self.sampler if problem_filter is None else self.filter_sampler(problem_filter)
+        if sampler is None:
+            return "No problems match the filter", "Mil-Spec (Blue)"
+        if rng is None:
+            _, rng = self.new_opening()
+        
+        # Tier by CS:GO probabilities, then a problem from that tier
+        # (an empty tier falls back to any problem; filtered samplers never draw one).
+        # Weights can only pick from whole tiers; filtered draws are
+        # uniform within the filter but still count towards the weights.
+        forced = self.pity.draw_tier(rng) if self.pity is not None else None
+        if forced is not None and sampler.empty[forced]:
+            forced = None  # Nothing to force in this tier (e.g. under a filter); draw as usual
+        if self.weighted is not None and problem_filter is None:
+            tier_index = sampler.draw_tier(rng) if forced is None else forced
+            problem_index = self.weighted.draw(tier_index, rng)
+        elif forced is None:
+            tier_index, problem_index = sampler.draw(rng)
+        else:
+            tier_index, problem_index = forced, sampler.draw_in_tier(forced, rng)
+        if self.weighted is not None:
+            self.weighted.observe(problem_index)
+        self.telemetry.record(tier_index, problem_index, sampler.empty[tier_index])
+        if self.pity is not None:
+            self.pity.observe(tier_index)
+        # The seed only describes this draw if it came from new_opening's generator
+        seed = self.last_seed if rng is self._opening_rng else 0
+        self._opening_rng = None
+        if self.history is not None:
+            self.history.append(problem_key(self.problems[problem_index]), tier_index, seed)
+        return self.problems[problem_index], TIERS[tier_index]
+    
+    def open_many(self, count: int, filter: Union[str, ProblemFilter, None] = None) -> List[Tuple[str, str]]:
+        """Open count cases in one vectorized draw (sequential in weighted mode)"""
+        if not self.problems:
+            return []
+        problem_filter = as_filter(filter)
+        sampler = self.sampler if problem_filter is None else self.filter_sampler(problem_filter)
+        if sampler is None:
+            return []
+        if self.weighted is None or problem_filter is not None:
+            tier_indices, problem_indices = sampler.draw_many(count)
+            if self.weighted is not None:
+                for problem_id in problem_indices.tolist():
+                    self.weighted.observe(problem_id)
         else:
-            problem = random.choice(tier_problems)
+            # Weights change after every draw, so weighted batches go one at a time
+            rng = self.rng.generator
+            tier_indices = np.empty(count, dtype=np.int64)
+            problem_indices = np.empty(count, dtype=np.int64)
+            for i in range(count):
+                tier_indices[i] = tier = self.sampler.draw_tier(rng)
+                problem_indices[i] = problem_id = self.weighted.draw(tier, rng)
+                self.weighted.observe(problem_id)
+        self.telemetry.record_many(tier_indices, problem_indices, sampler.empty[tier_indices])
+        # Batches are logged and advance pity streaks, but are never boosted
+        if self.pity is not None:
+            self.pity.observe_many(tier_indices)
+        problems = self.problems
+        if self.history is not None:
+            keys = np.fromiter(
+                (problem_key(problems[p]) for p in problem_indices.tolist()), dtype=np.uint32, count=count
+            )
+            self.history.append_many(keys, tier_indices)
+        return [(problems[p], TIERS[t]) for t, p in zip(tier_indices.tolist(), problem_indices.tolist())]
+    
+    def open_many_ids(self, count: int, rng: Optional[np.random.Generator] = None,
+                      filter: Union[str, ProblemFilter, None] = None) -> List[Tuple[int, str]]:
+        """Like open_many, but returns (problem id, tier) pairs
         
-        return problem, selected_tier
+        rng defaults to the manager's own stream. These draws fill the
+        reel and are not counted in telemetry.
+        """
+        if not self.problems:
+            return []
+        problem_filter = as_filter(filter)
+        sampler = self.sampler if problem_filter is None else self.filter_sampler(problem_filter)
+        if sampler is None:
+            return []
+        tier_indices, problem_indices = sampler.draw_many(count, rng)
+        return [
+            (p, TIERS[t])
+            for t, p in zip(tier_indices.tolist(), problem_indices.tolist())
+        ]
     
     def get_problem_tier(self, problem: str) -> str:
         """Get the tier for a specific problem"""
-        for tier, problems in self.tiered_problems.items():
-            if problem in problems:
-                return tier
-        return "Mil-Spec (Blue)"  # Default
+        problem_id = self.problems.get_id(problem)
+        if problem_id is None:
+            return "Mil-Spec (Blue)"  # Default
+        return TIERS[self.tier_of[problem_id]]
+    
+    def get_problem_id(self, problem: str) -> Optional[int]:
+        """Get the stable integer id of a problem, or None if unknown"""
+        return self.problems.get_id(problem)
+    
+    def get_problem(self, problem_id: int) -> str:
+        """Get the problem text for an id"""
+        return self.problems[problem_id]
+    
+    def get_record(self, problem_id: int) -> ProblemRecord:
+        """Get the parsed LeetCode number and title for an id"""
+        return self.problems.record(problem_id)
     
     def get_tier_color(self, tier: str) -> str:
         """Get the color code for a tier"""
@@ -134,4 +822,9 @@ class ProblemManager:
     def get_problem_count(self) -> int:
         """Get total number of problems"""
         return len(self.problems)
+    
+    def memory_footprint(self) -> int:
+        """Approximate bytes held by the problem table, tiers and indexes"""
+        # The sampler and tier_members share tier_order rather than copying it
+        return self.problems.nbytes() + self.tier_order.nbytes + self.tier_of.nbytes
 
@@ -0,0 +1,191 @@
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+NO_NUMBER = -1  # numbers[] value for lines that are not "<number>. <title>"
+
+def parse_problem(line: str) -> Tuple[int, str]:
+    """Split "212. Word Search II" into (212, "Word Search II")
+    
+    Only splits when formatting the parts back gives the exact line, so
+    every line round-trips; anything else is (NO_NUMBER, line).
+    """
+    head, _, title = line.partition(". ")
+    # Up to 9 digits always fits numbers[]' int32
+    if title and len(head) < 10 and head.isdigit() and head.isascii() and (head[0] != "0" or head == "0"):
+        return int(head), title
+    return NO_NUMBER, line
+
+def format_problem(number: int, title: str) -> str:
+    return title if number == NO_NUMBER else f"{number}. {title}"
+
+class ProblemRecord:
+    """One problem as its LeetCode number (None if it has none) and title"""
+    
+    __slots__ = ("number", "title")
+    
+    def __init__(self, number: Optional[int], title: str):
+        self.number = number
+        self.title = title
+    
+    @classmethod
+    def parse(cls, line: str) -> "ProblemRecord":
+        number, title = parse_problem(line)
+        return cls(None if number == NO_NUMBER else number, title)
+    
+    @property
+    def text(self) -> str:
+        """The problem line as it appears in the problem file"""
+        return format_problem(NO_NUMBER if self.number is None else self.number, self.title)
+    
+    def __str__(self) -> str:
+        return self.text
+    
+    def __repr__(self) -> str:
+        return f"ProblemRecord({self.number!r}, {self.title!r})"
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ProblemRecord) and (self.number, self.title) == (other.number, other.title)
+    
+    def __hash__(self) -> int:
+        return hash((self.number, self.title))
+
+class ProblemTable:
+    """Append-only table of unique problems, stored column-wise
+    
+    Each problem is a LeetCode number in an array('i') and one title
+    string; the full "212. Word Search II" line is only rebuilt when asked
+    for. The title -> id index doubles as the table's intern pool, so the
+    title string is held once, and a rebuilt table can reuse the previous
+    table's strings instead of keeping two copies alive. Lines whose title
+    is already taken by another number go in a small overflow index keyed
+    by the whole line.
+    
+    Reads like a sequence of problem lines: table[i], len(), iteration.
+    """
+    
+    __slots__ = ("numbers", "titles", "ids", "overflow", "_pool")
+    
+    def __init__(self, lines: Sequence[str] = (), previous: Optional["ProblemTable"] = None):
+        """Add lines (duplicates dropped); previous is an older table to share title strings with"""
+        self.numbers = array('i')
+        self.titles = []
+        self.ids: Dict[str, int] = {}  # title -> id of the first problem with that title
+        self.overflow: Dict[str, int] = {}  # line -> id, for titles shared by several numbers
+        self._pool = previous
+        for line in lines:
+            self.add(line)
+    
+    @classmethod
+    def from_columns(cls, numbers: array, titles: List[str]) -> "ProblemTable":
+        """Table over already parsed, unique problems (e.g. from a snapshot), adopted without copying"""
+        table = cls()
+        table.numbers = numbers
+        table.titles = titles
+        # Built in reverse so the first problem with each title owns it
+        table.ids = dict(zip(reversed(titles), range(len(titles) - 1, -1, -1)))
+        if len(table.ids) < len(titles):
+            ids = table.ids
+            table.overflow = {
+                format_problem(numbers[i], title): i
+                for i, title in enumerate(titles) if ids[title] != i
+            }
+        return table
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    def __getitem__(self, problem_id: int) -> str:
+        return format_problem(self.numbers[problem_id], self.titles[problem_id])
+    
+    def __iter__(self) -> Iterator[str]:
+        return map(format_problem, self.numbers, self.titles)
+    
+    def __contains__(self, line: str) -> bool:
+        return self.get_id(line) is not None
+    
+    def get_id(self, line: str) -> Optional[int]:
+        """Id of a problem line, or None if it is not in the table"""
+        number, title = parse_problem(line)
+        problem_id = self.ids.get(title)
+        if problem_id is not None and self.numbers[problem_id] == number:
+            return problem_id
+        return self.overflow.get(line) if self.overflow else None
+    
+    def add(self, line: str) -> Tuple[int, bool]:
+        """Add a problem line; returns (id, True), or (existing id, False) for a duplicate"""
+        number, title = parse_problem(line)
+        problem_id = self.ids.get(title)
+        if problem_id is None:
+            if self._pool is not None:
+                title = self._intern(title)
+            self.ids[title] = len(self.titles)
+        elif self.numbers[problem_id] == number:
+            return problem_id, False
+        else:
+            problem_id = self.overflow.get(line)
+            if problem_id is not None:
+                return problem_id, False
+            self.overflow[line] = len(self.titles)
+        problem_id = len(self.titles)
+        self.numbers.append(number)
+        self.titles.append(title)
+        return problem_id, True
+    
+    def _intern(self, title: str) -> str:
+        """The previous table's copy of an equal title string, if it had one"""
+        pooled_id = self._pool.ids.get(title)
+        return title if pooled_id is None else self._pool.titles[pooled_id]
+    
+    def record(self, problem_id: int) -> ProblemRecord:
+        """A problem's parsed number and title"""
+        number = self.numbers[problem_id]
+        return ProblemRecord(None if number == NO_NUMBER else number, self.titles[problem_id])
+    
+    def number_array(self) -> np.ndarray:
+        """LeetCode numbers by problem id (NO_NUMBER for unnumbered problems), without copying"""
+        return np.frombuffer(self.numbers, dtype=np.int32) if len(self.numbers) else np.zeros(0, dtype=np.int32)
+    
+    def release_pool(self):
+        """Stop sharing strings with the previous table, e.g. once loading is done"""
+        self._pool = None
+    
+    def copy(self) -> "ProblemTable":
+        """Independent table with the same problems (title strings are shared)"""
+        clone = ProblemTable()
+        clone.numbers = array('i', self.numbers)
+        clone.titles = list(self.titles)
+        clone.ids = dict(self.ids)
+        clone.overflow = dict(self.overflow)
+        return clone
+    
+    def nbytes(self) -> int:
+        """Approximate bytes held by the table, including the title strings"""
+        size = self.numbers.buffer_info()[1] * self.numbers.itemsize
+        size += sys.getsizeof(self.titles) + sum(sys.getsizeof(title) for title in self.titles)
+        return size + sys.getsizeof(self.ids) + sys.getsizeof(self.overflow)
+
+class ProblemSlice:
+    """Read-only sequence of problem lines for a list of ids, e.g. one tier"""
+    
+    __slots__ = ("table", "ids")
+    
+    def __init__(self, table: ProblemTable, ids: Union[np.ndarray, Sequence[int]]):
+        self.table = table
+        self.ids = ids
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ProblemSlice(self.table, self.ids[index])
+        return self.table[int(self.ids[index])]
+    
+    def __iter__(self) -> Iterator[str]:
+        table = self.table
+        return (table[problem_id] for problem_id in np.asarray(self.ids).tolist())
+    
+    def __repr__(self) -> str:
+        return f"ProblemSlice({len(self)} problems)"
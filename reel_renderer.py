@@ -0,0 +1,317 @@
+import tkinter as tk
+from tkinter import font
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from problem_manager import TIER_COLORS
+
+class FontCache:
+    """Shared font.Font objects, created once per (family, size, weight)"""
+    
+    def __init__(self):
+        self._fonts: Dict[Tuple[str, int, str], font.Font] = {}
+    
+    def get(self, family: str = "Arial", size: int = 11, weight: str = "normal") -> font.Font:
+        key = (family, size, weight)
+        cached = self._fonts.get(key)
+        if cached is None:
+            cached = font.Font(family=family, size=size, weight=weight)
+            self._fonts[key] = cached
+        return cached
+
+def card_text(problem: str) -> str:
+    """Problem title as shown on a card (truncated if too long)"""
+    return problem[:30] + "..." if len(problem) > 30 else problem
+
+def hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+class CardSprites:
+    """Pre-rendered reel cards as Tk PhotoImages, kept in an LRU
+    
+    Each distinct (problem id, tier, selected) card is rasterized once
+    with pygame's font renderer and handed to Tk as PPM data, so showing
+    a card is one image item instead of rectangles, a stippled overlay
+    and two text items. The dimmed look of non-selected cards is baked
+    into the pixels rather than composited through a stipple every frame.
+    
+    available is False when pygame cannot render text; callers then fall
+    back to plain canvas items.
+    """
+    
+    def __init__(self, master, width: int = 200, height: int = 180, max_sprites: int = 128):
+        self.master = master
+        self.width = width
+        self.height = height
+        self.max_sprites = max(1, max_sprites)
+        self.sprites = OrderedDict()  # (problem id, tier, selected) -> (text, PhotoImage), oldest first
+        self.hits = 0
+        self.misses = 0
+        self._pygame = None
+        self._fonts = None
+        self.available = self._load()
+    
+    def _load(self) -> bool:
+        """Import pygame and open the card fonts; False if that is not possible"""
+        try:
+            import pygame
+            pygame.font.init()
+            # Tk sizes are points; pygame sizes are pixels (96 dpi)
+            self._fonts = (pygame.font.Font(None, 20), pygame.font.Font(None, 18))
+        except (ImportError, RuntimeError, OSError) as e:
+            print(f"Warning: card sprites unavailable, drawing cards as canvas items: {e}")
+            return False
+        self._pygame = pygame
+        return True
+    
+    def get(self, problem_id: int, tier: str, selected: bool, problem: str):
+        """The sprite for a card, rendering it on a miss
+        
+        problem is the title the id currently maps to; a cached sprite
+        whose title changed (ids renumbered by a reload) is re-rendered.
+        """
+        key = (problem_id, tier, selected)
+        text = card_text(problem)
+        cached = self.sprites.get(key)
+        if cached is not None and cached[0] == text:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        image = self._render(text, tier, selected)
+        self.sprites[key] = (text, image)
+        self.sprites.move_to_end(key)
+        while len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return image
+    
+    def warm(self, cards: List[Tuple[int, str, bool, str]]):
+        """Render every (problem id, tier, selected, title) card ahead of time"""
+        for card in cards[-self.max_sprites:]:
+            self.get(*card)
+    
+    def clear(self):
+        self.sprites.clear()
+    
+    def _render(self, text: str, tier: str, selected: bool):
+        """Rasterize one card the way the canvas items would draw it"""
+        pygame = self._pygame
+        width, height = self.width, self.height
+        tier_color = hex_to_rgb(TIER_COLORS.get(tier, "#FFFFFF"))
+        surface = pygame.Surface((width, height))
+        
+        # Selected card gets white border and full brightness; the rest
+        # are dimmed by half like the 50% dark overlay
+        if selected:
+            surface.fill(tier_color)
+            pygame.draw.rect(surface, (255, 255, 255), surface.get_rect(), 4)
+        else:
+            surface.fill(tuple(c // 2 for c in tier_color))
+        
+        title_font, tier_font = self._fonts
+        lines = self._wrap(title_font, text, width - 20)
+        line_height = title_font.get_linesize()
+        top = height / 2 - 20 - line_height * len(lines) / 2
+        for i, line in enumerate(lines):
+            rendered = title_font.render(line, True, (255, 255, 255))
+            surface.blit(rendered, rendered.get_rect(center=(width / 2, top + line_height * (i + 0.5))))
+        rendered = tier_font.render(tier.split()[0], True, (255, 255, 255))
+        surface.blit(rendered, rendered.get_rect(center=(width / 2, height / 2 + 20)))
+        
+        header = f"P6 {width} {height} 255\n".encode("ascii")
+        return tk.PhotoImage(master=self.master, width=width, height=height,
+                             data=header + pygame.image.tobytes(surface, "RGB"), format="PPM")
+    
+    @staticmethod
+    def _wrap(title_font, text: str, width: int) -> List[str]:
+        """Greedy word wrap to a pixel width, like a canvas text item's width option"""
+        lines = []
+        for word in text.split():
+            if lines and title_font.size(lines[-1] + " " + word)[0] <= width:
+                lines[-1] += " " + word
+            else:
+                lines.append(word)
+        return lines or [""]
+
+class CardSlot:
+    """Canvas items for one reusable reel card
+    
+    With sprites the card is a single image item; otherwise it is built
+    from rectangles and text items.
+    """
+    
+    def __init__(self, canvas, tag: str, width: int, height: int, fonts: FontCache, sprites: bool = False):
+        self.tag = tag
+        self.index = None  # Reel index currently shown, None when hidden
+        self.x = 0.0
+        self.y = 0.0
+        self.width = width
+        self.height = height
+        self.sprite = None  # PhotoImage currently shown by image
+        if sprites:
+            self.image = canvas.create_image(0, 0, anchor="nw", tags=(tag,))
+            canvas.itemconfig(tag, state="hidden")
+            return
+        self.image = None
+        self.base = canvas.create_rectangle(0, 0, width, height, tags=(tag,))
+        # Dark overlay to make non-selected cards slightly dimmer (like CS:GO)
+        self.overlay = canvas.create_rectangle(
+            0, 0, width, height,
+            fill="#000000",
+            outline="",
+            stipple="gray50",  # 50% opacity dark overlay
+            tags=(tag,)
+        )
+        self.problem_text = canvas.create_text(
+            width / 2, height / 2 - 20,
+            font=fonts.get("Arial", 11, "bold"),
+            fill="#FFFFFF",
+            width=width - 20,
+            tags=(tag,)
+        )
+        self.tier_text = canvas.create_text(
+            width / 2, height / 2 + 20,
+            font=fonts.get("Arial", 10),
+            fill="#FFFFFF",
+            tags=(tag,)
+        )
+        canvas.itemconfig(tag, state="hidden")
+
+class ReelRenderer:
+    """Retained-mode renderer for the scrolling loot bar
+    
+    Card item groups are created once per reel slot and recycled as cards
+    scroll off-screen. A frame only moves existing items, and touches
+    their contents when a slot starts showing a different card. With
+    use_sprites, each card is a cached pre-rendered image (CardSprites).
+    """
+    
+    def __init__(self, canvas, get_problem: Callable[[int], str], fonts: FontCache,
+                 view_width: int = 900, center_x: int = 450, center_y: int = 125,
+                 card_width: int = 200, card_height: int = 180, card_spacing: int = 10,
+                 use_sprites: bool = True, max_sprites: int = 128):
+        self.canvas = canvas
+        self.get_problem = get_problem
+        self.fonts = fonts
+        self.use_sprites = use_sprites
+        self.max_sprites = max_sprites
+        self.sprites: Optional[CardSprites] = None  # Created with the slots, on first use
+        self.view_width = view_width
+        self.center_x = center_x
+        self.center_y = center_y
+        self.card_width = card_width
+        self.card_height = card_height
+        self.pitch = card_width + card_spacing
+        # Enough slots for every card that can overlap the view at once
+        self.slot_count = int((view_width + 2 * card_width) / self.pitch) + 2
+        self.slots: List[CardSlot] = []
+        self.items: List[Tuple[int, str]] = []
+        self.selected = None  # (problem id, tier) of the winning card
+        self.center_line = None
+    
+    def _ensure_items(self):
+        """Create the slot pool and center line on first use"""
+        if self.slots:
+            return
+        if self.use_sprites:
+            self.sprites = CardSprites(self.canvas, self.card_width, self.card_height, self.max_sprites)
+            if not self.sprites.available:
+                self.sprites = None
+        # Center indicator line, created first so cards draw over it
+        self.center_line = self.canvas.create_line(
+            self.center_x, 20,
+            self.center_x, 230,
+            fill="#FFFFFF",
+            width=3,
+            dash=(5, 5)
+        )
+        for i in range(self.slot_count):
+            self.slots.append(CardSlot(
+                self.canvas, f"reel_card_{i}", self.card_width, self.card_height, self.fonts,
+                sprites=self.sprites is not None
+            ))
+    
+    def set_items(self, items: List[Tuple[int, str]], selected: Optional[Tuple[int, str]]):
+        """Start a new reel of (problem id, tier) items"""
+        self._ensure_items()
+        self.items = items
+        self.selected = selected
+        for slot in self.slots:
+            slot.index = None
+            self.canvas.itemconfig(slot.tag, state="hidden")
+        self.set_final(False)
+    
+    def visible_range(self, scroll_position: float) -> Tuple[int, int]:
+        """Reel indices [first, last) that overlap the view at a scroll offset"""
+        first = max(0, int((scroll_position - self.card_width) // self.pitch) + 1)
+        last = min(len(self.items), int((scroll_position + self.view_width + self.card_width) // self.pitch) + 1)
+        return first, last
+    
+    def warm(self, start_position: float, end_position: float):
+        """Pre-render the sprite of every card shown while scrolling between two offsets"""
+        self._ensure_items()
+        if self.sprites is None:
+            return
+        first = self.visible_range(min(start_position, end_position))[0]
+        last = self.visible_range(max(start_position, end_position))[1]
+        self.sprites.warm([
+            (problem_id, tier, (problem_id, tier) == self.selected, self.get_problem(problem_id))
+            for problem_id, tier in self.items[first:last]
+        ])
+    
+    def set_final(self, final: bool):
+        """Dashed center line while spinning, solid once the reel stops"""
+        self._ensure_items()
+        if final:
+            self.canvas.itemconfig(self.center_line, width=4, dash=())
+        else:
+            self.canvas.itemconfig(self.center_line, width=3, dash=(5, 5))
+    
+    def render(self, scroll_position: float):
+        """Position the visible cards for a scroll offset"""
+        self._ensure_items()
+        first, last = self.visible_range(scroll_position)
+        visible = set(range(first, last))
+        y = self.center_y - self.card_height / 2
+        
+        for i in visible:
+            slot = self.slots[i % self.slot_count]
+            x = i * self.pitch - scroll_position
+            if slot.index != i:
+                self.canvas.itemconfig(slot.tag, state="normal")
+                self._bind(slot, i)
+                self.canvas.move(slot.tag, x - slot.x, y - slot.y)
+            elif x != slot.x:
+                self.canvas.move(slot.tag, x - slot.x, 0)
+            slot.x = x
+            slot.y = y
+        
+        # Hide slots whose card scrolled out of view
+        for slot in self.slots:
+            if slot.index is not None and slot.index not in visible:
+                slot.index = None
+                self.canvas.itemconfig(slot.tag, state="hidden")
+    
+    def _bind(self, slot: CardSlot, index: int):
+        """Point a slot at a different reel card - all cards show tier color like CS:GO"""
+        problem_id, tier = self.items[index]
+        selected = (problem_id, tier) == self.selected
+        slot.index = index
+        
+        if self.sprites is not None:
+            sprite = self.sprites.get(problem_id, tier, selected, self.get_problem(problem_id))
+            if sprite is not slot.sprite:
+                slot.sprite = sprite  # Also keeps the image alive while shown
+                self.canvas.itemconfig(slot.image, image=sprite)
+            return
+        
+        # Selected card gets white border and full brightness
+        tier_color = TIER_COLORS.get(tier, "#FFFFFF")
+        if selected:
+            self.canvas.itemconfig(slot.base, fill=tier_color, outline="#FFFFFF", width=4)
+            self.canvas.itemconfig(slot.overlay, state="hidden")
+        else:
+            self.canvas.itemconfig(slot.base, fill=tier_color, outline=tier_color, width=2)
+        
+        # Problem text (truncate if too long)
+        self.canvas.itemconfig(slot.problem_text, text=card_text(self.get_problem(problem_id)))
+        self.canvas.itemconfig(slot.tier_text, text=tier.split()[0])
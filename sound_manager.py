@@ -1,127 +1,443 @@
 import numpy as np
-import pygame
 import io
 import threading
+from collections import OrderedDict, deque
+
+# pygame is imported by the first SoundManager that starts the mixer,
+# not when this module is imported, so callers can bring their window up
+# before paying for it
+pygame = None
+
+def load_pygame():
+    """Import pygame on first use and return the module"""
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
+
+SAMPLE_RATE = 22050
+MAX_SAMPLE = 2**(16 - 1) - 1
+
+# Spin speed factors sweep from SPIN_MAX_SPEED (fast) down to SPIN_MIN_SPEED
+SPIN_MIN_SPEED = 0.1
+SPIN_MAX_SPEED = 1.0
+
+# Mixer channel reserved for the streamed spin voice; one-shot sounds
+# never land on it
+SPIN_CHANNEL = 0
+
+
+# Synthesis engine - every helper works on whole sample arrays at once,
+# so building a buffer costs a handful of NumPy calls instead of one
+# Python iteration per frame.
+
+def sample_indices(duration, sample_rate=SAMPLE_RATE):
+    """Return the frame indices 0..frames-1 for a buffer of given duration"""
+    frames = int(duration * sample_rate)
+    return np.arange(frames, dtype=np.float64)
+
+def time_vector(duration, sample_rate=SAMPLE_RATE):
+    """Return the time (in seconds) of every frame in the buffer"""
+    return sample_indices(duration, sample_rate) / sample_rate
+
+def oscillator(frequency, t):
+    """Sine oscillator; frequency may be a scalar or a per-frame array"""
+    return np.sin(2 * np.pi * frequency * t)
+
+def exp_decay(t, rate):
+    """Exponential decay envelope starting at 1.0"""
+    return np.exp(-t * rate)
+
+def linear_fade(t, duration):
+    """Linear fade-out envelope from 1.0 down to 0.0 at `duration`"""
+    return 1 - t / duration
+
+def to_stereo(wave):
+    """Truncate a mono float wave to int16 and broadcast it to both channels"""
+    mono = wave.astype(np.int16)
+    return np.ascontiguousarray(np.broadcast_to(mono[:, None], (mono.shape[0], 2)))
+
+class SoundBank:
+    """Size-bounded LRU cache of rendered pygame Sounds"""
+    
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._sounds = OrderedDict()
+        self._lock = threading.RLock()  # Shared by the UI thread and the render worker
+    
+    def get(self, key, render):
+        """Return the cached sound for key, calling render() once on a miss"""
+        with self._lock:
+            sound = self._sounds.get(key)
+            if sound is not None:
+                self._sounds.move_to_end(key)
+                self.hits += 1
+                return sound
+            
+            self.misses += 1
+            sound = render()
+            if sound is not None:
+                self._sounds[key] = sound
+                while len(self._sounds) > self.max_size:
+                    self._sounds.popitem(last=False)  # Evict least recently used
+            return sound
+    
+    def clear(self):
+        """Drop every cached sound and reset the counters"""
+        with self._lock:
+            self._sounds.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Get cache size and hit/miss counters"""
+        return {
+            "size": len(self._sounds),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+    
+    def __len__(self):
+        return len(self._sounds)
+
+class RenderWorker:
+    """Background thread that renders and plays sounds off the UI thread"""
+    
+    def __init__(self, sound_manager, max_pending=8):
+        self.sound_manager = sound_manager
+        self.max_pending = max_pending
+        self.dropped = 0     # One-shot requests rejected because the queue was full
+        self.coalesced = 0   # Spin requests replaced by a newer one before rendering
+        self._events = deque()
+        self._pending_spin = None  # Only the latest spin speed is ever rendered
+        self._running = True
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="sound-render", daemon=True)
+        self._thread.start()
+    
+    def request(self, event):
+        """Queue a one-shot sound event; returns immediately"""
+        with self._cond:
+            if not self._running:
+                return
+            if len(self._events) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._events.append(event)
+            self._cond.notify()
+    
+    def request_spin_stop(self):
+        """Queue stopping the spin voice; drops any spin update still pending"""
+        with self._cond:
+            if not self._running:
+                return
+            self._pending_spin = None
+            self._events.append("spin_stop")
+            self._cond.notify()
+    
+    def request_spin(self, speed_factor):
+        """Queue a spin sound, replacing any spin that has not rendered yet"""
+        with self._cond:
+            if not self._running:
+                return
+            if self._pending_spin is not None:
+                self.coalesced += 1
+            self._pending_spin = speed_factor
+            self._cond.notify()
+    
+    def _next_job(self):
+        """Block until there is work; returns None once shut down"""
+        with self._cond:
+            while self._running and not self._events and self._pending_spin is None:
+                self._cond.wait()
+            if not self._running:
+                return None
+            # One-shot events (open, stop, gold) take priority over spin ticks
+            if self._events:
+                return self._events.popleft(), None
+            speed_factor = self._pending_spin
+            self._pending_spin = None
+            return "spin", speed_factor
+    
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self.sound_manager.play_now(*job)
+            except Exception as e:
+                # Any failure drops this sound only; the worker keeps serving the queue
+                print(f"Warning: Sound playback failed: {e!r}")
+    
+    def shutdown(self, timeout=1.0):
+        """Stop the worker, discarding anything still queued"""
+        with self._cond:
+            self._running = False
+            self._events.clear()
+            self._pending_spin = None
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+class SpinVoice:
+    """The spin whir as one continuous stream on a reserved mixer channel
+    
+    pump() keeps the channel fed with short chunks: one playing and one
+    queued behind it. Each chunk glides from the previous chunk's pitch
+    to the current speed_factor, and carries the oscillator and tremolo
+    phases over from the previous chunk, so chunk boundaries are seamless.
+    """
+    
+    def __init__(self, channel, base_freq=250, chunk_duration=0.05, volume=0.3):
+        self.channel = channel
+        self.base_freq = base_freq
+        self.chunk_frames = int(chunk_duration * SAMPLE_RATE)
+        self.volume = volume
+        self.speed_factor = SPIN_MAX_SPEED
+        self.active = False
+        self.chunks = 0     # Chunks rendered since the voice was created
+        self.underruns = 0  # Times the channel ran dry mid-spin and had to restart
+        self._frequency = None  # Pitch at the end of the last chunk
+        self._phase = 0.0
+        self._tremolo_phase = 0.0
+        # Per-frame time offsets within a chunk, shared by every render
+        self._steps = np.arange(self.chunk_frames, dtype=np.float64)
+    
+    def render_chunk(self):
+        """Render the next chunk and advance the phases"""
+        target = self.base_freq * self.speed_factor
+        start = target if self._frequency is None else self._frequency
+        frequency = start + (target - start) * (self._steps + 1) / self.chunk_frames
+        
+        # Integrate the instantaneous frequency so pitch changes never jump phase
+        increments = 2 * np.pi * frequency / SAMPLE_RATE
+        phase = self._phase + np.cumsum(increments) - increments
+        tremolo = self._tremolo_phase + 2 * np.pi * 5 * self._steps / SAMPLE_RATE
+        wave = MAX_SAMPLE * self.volume * np.sin(phase) * (1 + 0.1 * np.sin(tremolo))
+        
+        self._phase = (phase[-1] + increments[-1]) % (2 * np.pi)
+        self._tremolo_phase = (self._tremolo_phase + 2 * np.pi * 5 * self.chunk_frames / SAMPLE_RATE) % (2 * np.pi)
+        self._frequency = target
+        self.chunks += 1
+        return pygame.sndarray.make_sound(to_stereo(wave))
+    
+    def pump(self, speed_factor):
+        """Follow speed_factor and top the channel up to one queued chunk"""
+        self.speed_factor = speed_factor
+        if not self.channel.get_busy():
+            if self.active:
+                self.underruns += 1
+            self.active = True
+            self.channel.play(self.render_chunk())
+        if self.channel.get_queue() is None:
+            self.channel.queue(self.render_chunk())
+    
+    def stop(self, fade_ms=40):
+        """Fade the stream out and reset it for the next spin"""
+        if self.active:
+            self.channel.fadeout(fade_ms)
+        self.active = False
+        self._frequency = None
+        self._phase = 0.0
+        self._tremolo_phase = 0.0
 
 class SoundManager:
-    def __init__(self):
-        """Initialize sound manager with pygame"""
+    def __init__(self, background=False, lazy=False):
+        """Initialize sound manager with pygame
+        
+        With background=True sounds are rendered and started on a worker
+        thread, and every play_* call returns immediately. With lazy=True
+        importing pygame, starting the mixer and warming the sounds all
+        happen on a separate thread; until that finishes every play_*
+        call is a silent no-op, and `ready` is set once it has.
+        """
+        # Only the open/stop/gold one-shots are banked; the spin voice
+        # renders its own chunks
+        self.sound_bank = SoundBank(3)
+        self.render_worker = None
+        self.spin_voice = None
+        self.sounds_enabled = False
+        self.ready = threading.Event()
+        self._init_thread = None
+        if lazy:
+            self._init_thread = threading.Thread(
+                target=self._start_audio, args=(background, True), name="sound-init", daemon=True
+            )
+            self._init_thread.start()
+        else:
+            self._start_audio(background, False)
+    
+    def _start_audio(self, background, warm):
+        """Import pygame, start the mixer and enable sound"""
         try:
+            load_pygame()
             pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-            self.sounds_enabled = True
         except:
-            self.sounds_enabled = False
             print("Warning: Sound initialization failed. Running without sound.")
+            self.ready.set()
+            return
+        
+        pygame.mixer.set_reserved(SPIN_CHANNEL + 1)
+        self.spin_voice = SpinVoice(pygame.mixer.Channel(SPIN_CHANNEL))
+        if background:
+            self.render_worker = RenderWorker(self)
+        # Set only once the mixer, voice and worker exist; warming can
+        # overlap the first play_* calls since the bank is locked
+        self.sounds_enabled = True
+        if warm:
+            self._render_all()
+        self.ready.set()
     
-    def generate_tone(self, frequency, duration, sample_rate=22050, volume=0.5):
+    def generate_tone(self, frequency, duration, sample_rate=SAMPLE_RATE, volume=0.5):
         """Generate a sine wave tone"""
         if not self.sounds_enabled:
             return None
         
-        frames = int(duration * sample_rate)
-        arr = np.zeros((frames, 2), dtype=np.int16)
-        max_sample = 2**(16 - 1) - 1
-        
-        for i in range(frames):
-            wave = max_sample * volume * np.sin(2 * np.pi * frequency * i / sample_rate)
-            arr[i][0] = int(wave)  # Left channel
-            arr[i][1] = int(wave)  # Right channel
-        
-        return pygame.sndarray.make_sound(arr)
+        t = time_vector(duration, sample_rate)
+        wave = MAX_SAMPLE * volume * oscillator(frequency, t)
+        return pygame.sndarray.make_sound(to_stereo(wave))
     
     def generate_click(self, frequency=800, duration=0.1):
         """Generate a metallic click sound (case opening)"""
         if not self.sounds_enabled:
             return None
         
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = np.zeros((frames, 2), dtype=np.int16)
-        max_sample = 2**(16 - 1) - 1
-        
-        # Click with quick attack and decay
-        for i in range(frames):
-            t = i / sample_rate
-            # Quick attack, exponential decay
-            envelope = np.exp(-t * 15) * (1 - t / duration)
-            wave = max_sample * 0.6 * envelope * np.sin(2 * np.pi * frequency * t)
-            arr[i][0] = int(wave)
-            arr[i][1] = int(wave)
-        
-        return pygame.sndarray.make_sound(arr)
+        t = time_vector(duration)
+        # Quick attack, exponential decay
+        envelope = exp_decay(t, 15) * linear_fade(t, duration)
+        wave = MAX_SAMPLE * 0.6 * envelope * oscillator(frequency, t)
+        return pygame.sndarray.make_sound(to_stereo(wave))
     
     def generate_spin_sound(self, base_freq=200, duration=0.1, speed_factor=1.0):
         """Generate spinning/whirring sound that can vary in speed"""
         if not self.sounds_enabled:
             return None
         
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = np.zeros((frames, 2), dtype=np.int16)
-        max_sample = 2**(16 - 1) - 1
-        
+        t = time_vector(duration)
         freq = base_freq * speed_factor
-        
-        for i in range(frames):
-            t = i / sample_rate
-            # Whirring sound with slight variation
-            wave = max_sample * 0.3 * np.sin(2 * np.pi * freq * t) * (1 + 0.1 * np.sin(2 * np.pi * 5 * t))
-            arr[i][0] = int(wave)
-            arr[i][1] = int(wave)
-        
-        return pygame.sndarray.make_sound(arr)
+        # Whirring sound with slight variation
+        wave = MAX_SAMPLE * 0.3 * oscillator(freq, t) * (1 + 0.1 * oscillator(5, t))
+        return pygame.sndarray.make_sound(to_stereo(wave))
     
     def generate_gold_chime(self):
         """Generate special gold tier chime sound"""
         if not self.sounds_enabled:
             return None
         
-        sample_rate = 22050
         duration = 0.5
-        frames = int(duration * sample_rate)
-        arr = np.zeros((frames, 2), dtype=np.int16)
-        max_sample = 2**(16 - 1) - 1
-        
+        t = time_vector(duration)
         # Ascending chime (like CS:GO gold reveal)
-        for i in range(frames):
-            t = i / sample_rate
-            # Ascending frequency with harmonics
-            freq = 400 + (t / duration) * 400  # 400Hz to 800Hz
-            envelope = np.exp(-t * 2)  # Decay
-            wave = max_sample * 0.7 * envelope * (
-                np.sin(2 * np.pi * freq * t) +
-                0.5 * np.sin(2 * np.pi * freq * 2 * t)  # Harmonic
-            )
-            arr[i][0] = int(wave)
-            arr[i][1] = int(wave)
-        
-        return pygame.sndarray.make_sound(arr)
+        freq = 400 + (t / duration) * 400  # 400Hz to 800Hz
+        envelope = exp_decay(t, 2)  # Decay
+        wave = MAX_SAMPLE * 0.7 * envelope * (
+            oscillator(freq, t) +
+            0.5 * oscillator(freq * 2, t)  # Harmonic
+        )
+        return pygame.sndarray.make_sound(to_stereo(wave))
+    
+    def get_case_open_sound(self):
+        """Get the cached case opening click"""
+        return self.sound_bank.get("case_open", lambda: self.generate_click(900, 0.15))
+    
+    def get_stop_sound(self):
+        """Get the cached stop click"""
+        return self.sound_bank.get("stop", lambda: self.generate_click(600, 0.08))
+    
+    def get_gold_sound(self):
+        """Get the cached gold tier chime"""
+        return self.sound_bank.get("gold", self.generate_gold_chime)
+    
+    def warm_up(self):
+        """Pre-render the one-shot sounds"""
+        if not self.sounds_enabled:
+            return
+        if self.render_worker:
+            self.render_worker.request("warm_up")
+            return
+        self._render_all()
+    
+    def _render_all(self):
+        # The spin voice renders its chunks as it plays, so only the
+        # one-shot sounds need warming
+        self.get_case_open_sound()
+        self.get_stop_sound()
+        self.get_gold_sound()
+    
+    def play_now(self, event, speed_factor=None):
+        """Render (or fetch from the bank) and start a sound on this thread"""
+        if event == "warm_up":
+            self._render_all()
+            return
+        if event == "spin":
+            self.spin_voice.pump(speed_factor)
+            return
+        if event == "spin_stop":
+            self.spin_voice.stop()
+            return
+        if event == "case_open":
+            sound = self.get_case_open_sound()
+        elif event == "stop":
+            sound = self.get_stop_sound()
+        elif event == "gold":
+            sound = self.get_gold_sound()
+        else:
+            raise ValueError(f"Unknown sound event: {event}")
+        if sound:
+            sound.play()
+    
+    def _play(self, event):
+        if not self.sounds_enabled:
+            return
+        if self.render_worker:
+            self.render_worker.request(event)
+        else:
+            self.play_now(event)
     
     def play_case_open(self):
         """Play case opening sound"""
-        if self.sounds_enabled:
-            sound = self.generate_click(900, 0.15)
-            if sound:
-                sound.play()
+        self._play("case_open")
     
     def play_spin(self, speed_factor=1.0):
-        """Play spinning sound at given speed"""
-        if self.sounds_enabled:
-            sound = self.generate_spin_sound(250, 0.05, speed_factor)
-            if sound:
-                sound.play()
+        """Keep the spin voice streaming at the given speed
+        
+        Call it every frame of the spin; it only renders a chunk when the
+        reserved channel has room for one.
+        """
+        if not self.sounds_enabled:
+            return
+        if self.render_worker:
+            self.render_worker.request_spin(speed_factor)
+        else:
+            self.play_now("spin", speed_factor)
+    
+    def stop_spin(self):
+        """Fade out the spin voice"""
+        if not self.sounds_enabled:
+            return
+        if self.render_worker:
+            self.render_worker.request_spin_stop()
+        else:
+            self.play_now("spin_stop")
     
     def play_stop(self):
         """Play stop/click sound"""
-        if self.sounds_enabled:
-            sound = self.generate_click(600, 0.08)
-            if sound:
-                sound.play()
+        self._play("stop")
     
     def play_gold_reveal(self):
         """Play gold tier reveal sound"""
+        self._play("gold")
+    
+    def shutdown(self):
+        """Stop the render worker and release the mixer"""
+        if self._init_thread is not None:
+            self._init_thread.join(1.0)
+        if self.render_worker:
+            self.render_worker.shutdown()
+            self.render_worker = None
         if self.sounds_enabled:
-            sound = self.generate_gold_chime()
-            if sound:
-                sound.play()
-
+            pygame.mixer.quit()
+            self.sounds_enabled = False
@@ -0,0 +1,125 @@
+"""Startup benchmark for the case opener
+
+Runs each measurement in a fresh interpreter and reports the median of
+several runs: how long the heavy imports take on their own, and how long
+the app takes from its first import to the first drawn frame (and to
+sound being ready in the background).
+
+    python startup_benchmark.py --runs 5 --max-first-frame-ms 400
+
+Exits with status 1 if a --max-* budget is exceeded, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+IMPORT_MODULES = ["numpy", "pygame", "problem_manager", "sound_manager", "case_opener"]
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import {module}
+print((time.perf_counter() - start) * 1000)
+"""
+
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import case_opener
+imported = time.perf_counter()
+import tkinter as tk
+root = tk.Tk()
+app = case_opener.CaseOpenerApp(root, watch_interval=None, history=False)
+root.update()  # Map and draw the window
+first_frame = time.perf_counter()
+pygame_loaded = "pygame" in sys.modules
+app.sound_manager.ready.wait(10)
+sound_ready = time.perf_counter()
+app.on_close()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_frame_ms": (first_frame - start) * 1000,
+    "sound_ready_ms": (sound_ready - start) * 1000,
+    "pygame_before_first_frame": pygame_loaded,
+}))
+"""
+
+def run_probe(code: str) -> str:
+    """Run code in a fresh interpreter from this directory; returns its last output line"""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return result.stdout.strip().splitlines()[-1]
+
+def measure_imports(runs: int) -> Dict[str, float]:
+    """Median cold import time of each module, in ms"""
+    timings = {}
+    for module in IMPORT_MODULES:
+        try:
+            samples = [float(run_probe(IMPORT_PROBE.format(module=module))) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"Warning: could not import {module}: {e}")
+            continue
+        timings[module] = round(statistics.median(samples), 1)
+    return timings
+
+def measure_startup(runs: int) -> Dict[str, object]:
+    """Median app startup milestones, in ms since the first import"""
+    samples: List[Dict[str, object]] = [json.loads(run_probe(STARTUP_PROBE)) for _ in range(runs)]
+    result = {
+        key: round(statistics.median(sample[key] for sample in samples), 1)
+        for key in ("import_ms", "first_frame_ms", "sound_ready_ms")
+    }
+    result["pygame_before_first_frame"] = any(sample["pygame_before_first_frame"] for sample in samples)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure case opener import time and time-to-first-frame")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="fail if importing case_opener is slower")
+    parser.add_argument("--max-first-frame-ms", type=float, default=None, help="fail if the first frame is slower")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    
+    imports = measure_imports(args.runs)
+    try:
+        startup = measure_startup(args.runs)
+    except RuntimeError as e:
+        startup = None
+        print(f"Warning: could not start the app (no display?): {e}")
+    
+    if args.json:
+        print(json.dumps({"imports_ms": imports, "startup": startup}, indent=2))
+    else:
+        print(f"Cold import time (median of {args.runs}):")
+        for module, ms in imports.items():
+            print(f"  {module:<18} {ms:8.1f} ms")
+        if startup:
+            print("App startup:")
+            print(f"  import case_opener {startup['import_ms']:8.1f} ms")
+            print(f"  first frame        {startup['first_frame_ms']:8.1f} ms")
+            print(f"  sound ready        {startup['sound_ready_ms']:8.1f} ms")
+            if startup["pygame_before_first_frame"]:
+                print("  note: pygame was already imported before the first frame")
+    
+    failed = []
+    if startup is None and (args.max_import_ms is not None or args.max_first_frame_ms is not None):
+        failed.append("app startup could not be measured")
+    if args.max_import_ms is not None and startup and startup["import_ms"] > args.max_import_ms:
+        failed.append(f"import {startup['import_ms']} ms > {args.max_import_ms} ms")
+    if args.max_first_frame_ms is not None and startup and startup["first_frame_ms"] > args.max_first_frame_ms:
+        failed.append(f"first frame {startup['first_frame_ms']} ms > {args.max_first_frame_ms} ms")
+    if failed:
+        print("Startup budget exceeded: " + "; ".join(failed))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import time
+from typing import Callable, List, Optional, Union
+import numpy as np
+
+def linear(t: float) -> float:
+    return t
+
+def ease_out_cubic(t: float) -> float:
+    """Fast start, smooth slowdown: 1 - (1 - t)^3"""
+    return 1 - (1 - t) ** 3
+
+class Trajectory:
+    """An animation precomputed as evenly spaced samples in one NumPy array
+    
+    Row i holds every animated value (one column each) at i * step_ms
+    into the animation, so a frame looks its values up instead of
+    evaluating the curves.
+    """
+    
+    def __init__(self, duration_ms: float, samples: np.ndarray):
+        self.duration_ms = duration_ms
+        self.samples = np.asarray(samples, dtype=np.float64)
+        self.last = len(self.samples) - 1
+        self.step_ms = duration_ms / self.last if self.last else 1.0
+    
+    @classmethod
+    def build(cls, duration_ms: float, curves: List[Callable[[np.ndarray], np.ndarray]],
+              step_ms: float = 1.0) -> "Trajectory":
+        """Sample each curve(t), t in [0, 1] as an array, every step_ms"""
+        t = np.linspace(0.0, 1.0, max(2, int(round(duration_ms / step_ms)) + 1))
+        return cls(duration_ms, np.column_stack([curve(t) for curve in curves]))
+    
+    def index(self, elapsed_ms: float) -> int:
+        """Row of the sample nearest to elapsed_ms, clamped to the animation"""
+        return min(self.last, max(0, int(elapsed_ms / self.step_ms + 0.5)))
+    
+    def at(self, elapsed_ms: float) -> np.ndarray:
+        return self.samples[self.index(elapsed_ms)]
+
+class FramePacer:
+    """Adapts a Timeline's tick interval to what frames actually cost
+    
+    A frame's cost is the time between two ticks minus the interval that
+    was requested, so it includes the redraw Tk does after the callbacks
+    return. A smoothed cost sets the next interval to aim at target_fps,
+    while always leaving at least min_idle_ms for input. It is also the
+    lead: how far ahead of the current time to pick a trajectory sample,
+    so each frame shows where the animation will be when it appears.
+    Slow machines skip samples instead of stretching the animation.
+    """
+    
+    def __init__(self, target_fps: float = 120, min_idle_ms: float = 2, max_interval_ms: float = 33,
+                 smoothing: float = 0.25):
+        self.target_ms = 1000 / target_fps
+        self.min_idle_ms = min_idle_ms
+        self.max_interval_ms = max_interval_ms
+        self.smoothing = smoothing  # Weight of the newest frame in the running cost
+        self.reset()
+    
+    def reset(self):
+        """Forget timings, e.g. when ticking resumes after being idle"""
+        self.cost_ms = 0.0
+        self.interval_ms = max(self.min_idle_ms, self.target_ms)
+        self.frames = 0
+        self._last_tick = None
+    
+    @property
+    def lead_ms(self) -> float:
+        return self.cost_ms
+    
+    def tick(self, now: float) -> int:
+        """Measure the frame that just ended; returns the next interval in ms"""
+        if self._last_tick is not None:
+            cost = max(0.0, now - self._last_tick - self.interval_ms)
+            self.cost_ms += self.smoothing * (cost - self.cost_ms) if self.frames else cost - self.cost_ms
+            self.frames += 1
+        self._last_tick = now
+        interval = min(self.max_interval_ms, max(self.min_idle_ms, self.target_ms - self.cost_ms))
+        self.interval_ms = max(1, int(round(interval)))  # after() takes whole ms
+        return self.interval_ms
+
+class Sequence:
+    """Keyframed steps that run one after another on a Timeline
+    
+    Built with tween(), wait() and call(), then start()ed. Each step
+    begins when the previous one was scheduled to end rather than on the
+    tick that noticed it, so late frames never stretch the timing.
+    """
+    
+    def __init__(self, timeline: "Timeline", tag: Optional[str] = None):
+        self.timeline = timeline
+        self.tag = tag
+        self.steps = []  # (kind, duration ms, callback, ease)
+        self.index = 0
+        self.step_start = 0.0
+        self.active = False
+        self.on_cancel: Optional[Callable[[], None]] = None  # Cleanup if cancelled part-way
+    
+    def tween(self, duration_ms: float, update: Callable[[float], None],
+              ease: Callable[[float], float] = linear) -> "Sequence":
+        """Call update(eased progress) every tick for duration_ms, ending on exactly 1.0"""
+        self.steps.append(("tween", duration_ms, update, ease))
+        return self
+    
+    def wait(self, duration_ms: float) -> "Sequence":
+        """Hold for duration_ms"""
+        self.steps.append(("wait", duration_ms, None, None))
+        return self
+    
+    def call(self, fn: Callable[[], None]) -> "Sequence":
+        """Run fn once, as soon as the previous step ends"""
+        self.steps.append(("call", 0, fn, None))
+        return self
+    
+    def start(self) -> "Sequence":
+        self.timeline.start(self)
+        return self
+    
+    def cancel(self):
+        self.timeline.cancel(self)
+    
+    def advance(self, now: float) -> bool:
+        """Run every step that is due; False once the sequence is over"""
+        while self.index < len(self.steps):
+            kind, duration, fn, ease = self.steps[self.index]
+            elapsed = now - self.step_start
+            if kind == "call":
+                fn()
+            elif kind == "tween":
+                fn(ease(min(1.0, elapsed / duration) if duration > 0 else 1.0))
+                if elapsed < duration and self.active:
+                    return True
+            elif elapsed < duration:
+                return True
+            if not self.active:
+                return False  # A callback cancelled this sequence
+            self.step_start += duration
+            self.index += 1
+        return False
+
+class Timeline:
+    """Non-blocking animation scheduler on a single Tk `after` tick
+    
+    Every running Sequence advances on the same tick, and the tick stops
+    rescheduling itself when nothing is running. Starting a tagged
+    sequence cancels any running one with the same tag, so a new opening
+    can always replace the previous one. With a FramePacer, the delay
+    between ticks follows the measured frame cost instead of interval_ms.
+    """
+    
+    def __init__(self, root, interval_ms: int = max(8, int(1000 / 60)), pacer: Optional[FramePacer] = None):
+        self.root = root
+        self.interval_ms = interval_ms  # Delay between ticks
+        self.pacer = pacer
+        self.sequences: List[Sequence] = []
+        self._after_id = None
+    
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter() * 1000
+    
+    def sequence(self, tag: Optional[str] = None) -> Sequence:
+        """A new, not yet started sequence"""
+        return Sequence(self, tag)
+    
+    def start(self, sequence: Sequence):
+        """Run a sequence's first due steps now and keep ticking it"""
+        if sequence.tag is not None:
+            self.cancel(sequence.tag)
+        sequence.active = True
+        sequence.index = 0
+        sequence.step_start = self.now()
+        if self.pacer and self._after_id is None:
+            # Ticking (re)starts here; the idle gap is not a frame
+            self.pacer.reset()
+            self.interval_ms = self.pacer.tick(sequence.step_start)
+        self.sequences.append(sequence)
+        self._run(sequence, sequence.step_start)
+        self._schedule()
+    
+    def is_running(self, tag: str) -> bool:
+        return any(sequence.tag == tag for sequence in self.sequences)
+    
+    def cancel(self, target: Union[str, Sequence]):
+        """Stop a sequence, or every sequence with a tag, without running the rest"""
+        for sequence in list(self.sequences):
+            if sequence is target or sequence.tag == target:
+                self._remove(sequence)
+                if sequence.on_cancel:
+                    sequence.on_cancel()
+        if not self.sequences and self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def cancel_all(self):
+        for sequence in list(self.sequences):
+            self.cancel(sequence)
+    
+    def _remove(self, sequence: Sequence):
+        sequence.active = False
+        if sequence in self.sequences:
+            self.sequences.remove(sequence)
+    
+    def _run(self, sequence: Sequence, now: float):
+        if sequence.active and not sequence.advance(now):
+            self._remove(sequence)
+    
+    def _schedule(self):
+        if self.sequences and self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        now = self.now()
+        if self.pacer:
+            self.interval_ms = self.pacer.tick(now)
+        for sequence in list(self.sequences):
+            self._run(sequence, now)
+        self._schedule()
@@ -0,0 +1,168 @@
+from array import array
+from collections import deque
+import numpy as np
+
+class FenwickTree:
+    """Binary indexed tree of float weights
+    
+    Point updates, prefix sums and "which item does this cumulative weight
+    land on" searches are all O(log n). The tree lives in an array('d'),
+    so single-element access stays cheap from Python.
+    """
+    
+    def __init__(self, weights: np.ndarray):
+        n = len(weights)
+        self.weights = array('d', np.asarray(weights, dtype=np.float64).tobytes())
+        # tree[i] covers (i - lowbit(i), i], built in O(n) from prefix sums
+        cumulative = np.zeros(n + 1, dtype=np.float64)
+        np.cumsum(weights, out=cumulative[1:])
+        index = np.arange(n + 1)
+        tree = cumulative - cumulative[index - (index & -index)]
+        self.tree = array('d', tree.tobytes())
+        self.top = 1 << (n.bit_length() - 1) if n else 0  # Highest power of two <= n
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    def get(self, i: int) -> float:
+        return self.weights[i]
+    
+    def set(self, i: int, weight: float):
+        """Set item i's weight"""
+        delta = weight - self.weights[i]
+        self.weights[i] = weight
+        tree = self.tree
+        n = len(tree) - 1
+        i += 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+    
+    def prefix_sum(self, i: int) -> float:
+        """Sum of the weights of items 0..i-1"""
+        tree = self.tree
+        total = 0.0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+    
+    def find(self, target: float) -> int:
+        """Index of the item whose cumulative weight range contains target"""
+        tree = self.tree
+        n = len(tree) - 1
+        position = 0
+        step = self.top
+        while step:
+            next_position = position + step
+            if next_position <= n and tree[next_position] <= target:
+                position = next_position
+                target -= tree[next_position]
+            step >>= 1
+        return min(position, n - 1)
+
+class SpacedRepetition:
+    """Per-problem weights for picking a problem inside a tier
+    
+    The tier itself still comes from the tier table; this only replaces
+    the uniform pick within it. Weights are kept in a FenwickTree laid out
+    in TierSampler.members order, so every tier is a contiguous window
+    and a weighted pick is two prefix sums and one search.
+    
+    A drawn problem's weight drops to `decay` (a solved one to
+    `solved_decay`) and doubles again every `recovery_opens` openings
+    until it is back to 1.0, so neglected problems steadily gain on
+    recent ones. Recoveries wait in a FIFO queue; each opening only
+    touches the problems that are due, O(log n) apiece.
+    """
+    
+    def __init__(self, members: np.ndarray, offsets: np.ndarray, sizes: np.ndarray,
+                 decay: float = 0.25, solved_decay: float = 0.05, recovery_opens: int = 50):
+        """members, offsets and sizes are a TierSampler's tier windows"""
+        self.decay = decay
+        self.solved_decay = solved_decay
+        self.recovery_opens = recovery_opens
+        self.opens = 0
+        self.due = {}  # problem id -> opening number of its next recovery step
+        self.queue = deque()  # (due, problem id), oldest first
+        self._layout(members, offsets, sizes, np.ones(len(members)))
+    
+    def _layout(self, members: np.ndarray, offsets: np.ndarray, sizes: np.ndarray, weights: np.ndarray):
+        """Build the tree in members order from weights indexed by problem id"""
+        self.offsets = offsets.tolist()
+        self.sizes = sizes.tolist()
+        self.position_of = np.empty(len(members), dtype=np.int64)  # problem id -> tree position
+        self.position_of[members] = np.arange(len(members))
+        self.problem_at = np.asarray(members).tolist()  # tree position -> problem id
+        self.tree = FenwickTree(weights[members])
+    
+    def relayout(self, members: np.ndarray, offsets: np.ndarray, sizes: np.ndarray):
+        """Follow a new tier assignment, keeping weights and pending recoveries
+        
+        Problem ids must be stable (new problems only appended); they
+        start at full weight.
+        """
+        weights = np.ones(len(members))
+        carried = self.weights()[:len(members)]
+        weights[:len(carried)] = carried
+        self._layout(members, offsets, sizes, weights)
+    
+    def reset(self):
+        """Forget every weight and pending recovery, e.g. after ids were renumbered"""
+        self.due.clear()
+        self.queue.clear()
+        self.tree = FenwickTree(np.ones(len(self.problem_at)))
+    
+    def draw(self, tier: int, rng: np.random.Generator) -> int:
+        """Draw a problem id from a tier in proportion to its weight"""
+        offset, size = self.offsets[tier], self.sizes[tier]
+        low = self.tree.prefix_sum(offset)
+        high = self.tree.prefix_sum(offset + size)
+        position = self.tree.find(low + rng.random() * (high - low))
+        position = min(max(position, offset), offset + size - 1)  # Guard against rounding at the edges
+        return self.problem_at[position]
+    
+    def weight(self, problem_id: int) -> float:
+        return self.tree.get(int(self.position_of[problem_id]))
+    
+    def weights(self) -> np.ndarray:
+        """Current weights indexed by problem id"""
+        by_position = np.frombuffer(self.tree.weights, dtype=np.float64)
+        result = np.empty(len(by_position), dtype=np.float64)
+        result[self.problem_at] = by_position
+        return result
+    
+    def penalize(self, problem_id: int, factor: float):
+        """Scale a problem's weight down and schedule its recovery"""
+        position = int(self.position_of[problem_id])
+        self.tree.set(position, self.tree.get(position) * factor)
+        self._schedule(problem_id)
+    
+    def observe(self, problem_id: int):
+        """Account for one opening that drew problem_id"""
+        self.opens += 1
+        self._recover()
+        self.penalize(problem_id, self.decay)
+    
+    def solved(self, problem_id: int):
+        """A problem was solved; push it much further back"""
+        self.penalize(problem_id, self.solved_decay)
+    
+    def _schedule(self, problem_id: int):
+        due = self.opens + self.recovery_opens
+        self.due[problem_id] = due
+        self.queue.append((due, problem_id))
+    
+    def _recover(self):
+        queue = self.queue
+        while queue and queue[0][0] <= self.opens:
+            due, problem_id = queue.popleft()
+            if self.due.get(problem_id) != due:
+                continue  # Penalized again since; a later entry owns it
+            position = int(self.position_of[problem_id])
+            weight = min(1.0, self.tree.get(position) * 2)
+            self.tree.set(position, weight)
+            if weight < 1.0:
+                self._schedule(problem_id)
+            else:
+                del self.due[problem_id]